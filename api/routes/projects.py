@@ -3,11 +3,14 @@ Project Management Routes
 List, fetch, and manage generated projects
 """
 
-import json
+import functools
+import heapq
+import orjson
+import os
 from pathlib import Path
 from typing import Optional, List
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from api.schemas import ProjectResponse, ProjectListResponse, ProjectListItem
 
 router = APIRouter()
@@ -16,15 +19,110 @@ router = APIRouter()
 OUTPUT_DIR = Path("output")
 MODIFIED_DIR = Path("modified_output")
 
+# String forms for the hot lookup path: os.path.isfile on an f-string
+# is one C call, with no Path construction unless the probe hits
+_DIR_STRS = (str(OUTPUT_DIR), str(MODIFIED_DIR))
+
 
 # ==========================================================
 # HELPERS
 # ==========================================================
 
+def _orjson_response(payload: dict) -> Response:
+    """JSON response encoded with orjson in one pass."""
+    return Response(content=orjson.dumps(payload), media_type="application/json")
+
+
+def _scan_projects(dirs) -> list:
+    """Collect (path, mtime) for every project file in the given dirs.
+
+    One os.scandir pass per directory: DirEntry.stat() reuses the data
+    from readdir, so this is one syscall batch per dir instead of a
+    glob plus a stat per file.
+    """
+    out = []
+    for d in dirs:
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    if e.name.startswith("project_v") and e.name.endswith(".json"):
+                        out.append((e.path, e.stat().st_mtime))
+        except FileNotFoundError:
+            continue
+    return out
+
+
+# stem -> path index over both project dirs, rebuilt only when a
+# directory's own mtime changes (any create/delete/rename bumps it).
+_INDEX = {"mtimes": (0, 0), "map": {}}
+
+
+def _dir_mtime_ns(folder: Path) -> int:
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _get_index() -> dict:
+    """Return the stem -> path map, rebuilding it if either dir changed."""
+    current = (_dir_mtime_ns(OUTPUT_DIR), _dir_mtime_ns(MODIFIED_DIR))
+    if current != _INDEX["mtimes"]:
+        # OUTPUT_DIR first so modified entries take precedence on collision
+        index = {
+            os.path.basename(path)[:-5]: path
+            for path, _ in _scan_projects((OUTPUT_DIR, MODIFIED_DIR))
+        }
+        _INDEX["map"] = index
+        _INDEX["mtimes"] = current
+    return _INDEX["map"]
+
+
+def _resolve_project(project_id: str) -> Optional[Path]:
+    """Find a project file by id: exact filename first, then substring.
+
+    The exact probe is two isfile() calls; a miss consults the cached
+    stem index (a dict hit instead of a directory scan) before falling
+    back to a substring search.
+    """
+    for base in _DIR_STRS:
+        candidate = f"{base}/{project_id}.json"
+        if os.path.isfile(candidate):
+            return Path(candidate)
+    index = _get_index()
+    indexed = index.get(project_id)
+    if indexed is not None:
+        return Path(indexed)
+    # Substring match over the cached stems — a pure Python scan, no
+    # syscalls, unlike the old *{id}* glob which fnmatch'd the whole dir.
+    match = next((path for stem, path in index.items() if project_id in stem), None)
+    return Path(match) if match is not None else None
+
+
 def load_project(file_path: Path) -> dict:
     """Load a project from disk."""
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # read_bytes issues a single stat-sized read; orjson parses the
+    # buffer without an intermediate str decode
+    return orjson.loads(file_path.read_bytes())
+
+
+@functools.lru_cache(maxsize=256)
+def _load_project_cached(path_str: str, mtime_ns: int) -> dict:
+    """Parse a project file, cached by (path, mtime).
+
+    Callers must treat the returned dict as read-only — it is shared
+    across requests until the file changes on disk.
+    """
+    return load_project(Path(path_str))
+
+
+def _resolve_and_load(project_id: str):
+    """Resolve an id and return (path, data), parsing at most once per mtime."""
+    file_path = _resolve_project(project_id)
+    if file_path is None:
+        return None, None
+    st = os.stat(file_path)
+    return file_path, _load_project_cached(str(file_path), st.st_mtime_ns)
 
 
 def get_project_files(project_data: dict) -> dict:
@@ -38,8 +136,15 @@ def get_project_files(project_data: dict) -> dict:
     return files
 
 
-def project_to_list_item(file_path: Path) -> ProjectListItem:
-    """Convert a project file to a list item."""
+@functools.lru_cache(maxsize=4096)
+def _project_list_item_cached(path_str: str, mtime_ns: int, size: int) -> ProjectListItem:
+    """Parse a project file into a list item, cached by (path, mtime, size).
+
+    Listing only needs four metadata fields, but extracting them costs a
+    full JSON parse. Keying the cache on the stat signature means each
+    file is parsed once per modification, not once per /projects call.
+    """
+    file_path = Path(path_str)
     try:
         data = load_project(file_path)
         metadata = data.get("metadata", {})
@@ -52,7 +157,7 @@ def project_to_list_item(file_path: Path) -> ProjectListItem:
             created_at=metadata.get("created_at", metadata.get("timestamp", "")),
             file_count=len(files)
         )
-    except Exception as e:
+    except Exception:
         return ProjectListItem(
             id=file_path.stem,
             version=0,
@@ -62,6 +167,18 @@ def project_to_list_item(file_path: Path) -> ProjectListItem:
         )
 
 
+def project_to_list_item(file_path: Path) -> ProjectListItem:
+    """Convert a project file to a list item."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return ProjectListItem(
+            id=file_path.stem, version=0, is_modification=False,
+            created_at="", file_count=0
+        )
+    return _project_list_item_cached(str(file_path), st.st_mtime_ns, st.st_size)
+
+
 # ==========================================================
 # ENDPOINTS
 # ==========================================================
@@ -96,27 +213,21 @@ async def list_projects(
     }
     ```
     """
-    projects = []
-    
-    # Collect project files
+    # Collect (path, mtime) pairs in one scandir pass per directory
     if type == "original":
-        files = list(OUTPUT_DIR.glob("project_v*.json"))
+        entries = _scan_projects((OUTPUT_DIR,))
     elif type == "modified":
-        files = list(MODIFIED_DIR.glob("project_v*.json"))
+        entries = _scan_projects((MODIFIED_DIR,))
     else:
-        files = list(OUTPUT_DIR.glob("project_v*.json")) + list(MODIFIED_DIR.glob("project_v*.json"))
-    
-    # Sort by modification time (newest first)
-    files = sorted(files, key=lambda f: f.stat().st_mtime, reverse=True)
+        entries = _scan_projects((OUTPUT_DIR, MODIFIED_DIR))
     
-    total = len(files)
+    total = len(entries)
     
-    # Apply pagination
-    files = files[offset:offset + limit]
-    
-    # Convert to list items
-    for file_path in files:
-        projects.append(project_to_list_item(file_path))
+    # Newest-first pagination without a full sort: O(N log k) for the
+    # top offset+limit entries instead of O(N log N) over everything
+    top = heapq.nlargest(offset + limit, entries, key=lambda e: e[1])
+    page = top[offset:offset + limit]
+    projects = [project_to_list_item(Path(path)) for path, _ in page]
     
     return ProjectListResponse(total=total, projects=projects)
 
@@ -142,31 +253,39 @@ async def get_latest_project(
     else:
         folders = [MODIFIED_DIR, OUTPUT_DIR]  # Prefer modified
     
-    latest_file = None
-    latest_time = 0
+    latest_path = None
+    latest_ns = -1
     
     for folder in folders:
-        for f in folder.glob("project_v*.json"):
-            mtime = f.stat().st_mtime
-            if mtime > latest_time:
-                latest_time = mtime
-                latest_file = f
+        try:
+            with os.scandir(folder) as it:
+                for e in it:
+                    if not (e.name.startswith("project_v") and e.name.endswith(".json")):
+                        continue
+                    # st_mtime_ns: integer compare, no float boxing per entry
+                    ns = e.stat().st_mtime_ns
+                    if ns > latest_ns:
+                        latest_ns = ns
+                        latest_path = e.path
+        except FileNotFoundError:
+            continue
     
-    if not latest_file:
+    if not latest_path:
         raise HTTPException(status_code=404, detail="No projects found")
     
+    latest_file = Path(latest_path)
     data = load_project(latest_file)
     
-    return {
+    return _orjson_response({
         "id": latest_file.stem,
         "path": str(latest_file),
         "metadata": data.get("metadata", {}),
         "files": get_project_files(data)
-    }
+    })
 
 
 @router.get("/projects/{project_id}", tags=["Projects"])
-async def get_project(project_id: str):
+async def get_project(project_id: str, request: Request):
     """
     Get a specific project by ID.
     
@@ -195,32 +314,27 @@ async def get_project(project_id: str):
     }
     ```
     """
-    # Search in both directories
-    for folder in [OUTPUT_DIR, MODIFIED_DIR]:
-        # Try exact match first
-        exact_path = folder / f"{project_id}.json"
-        if exact_path.exists():
-            data = load_project(exact_path)
-            return {
-                "id": project_id,
-                "path": str(exact_path),
-                "metadata": data.get("metadata", {}),
-                "files": get_project_files(data)
-            }
-        
-        # Try partial match
-        matches = list(folder.glob(f"*{project_id}*.json"))
-        if matches:
-            file_path = matches[0]
-            data = load_project(file_path)
-            return {
-                "id": file_path.stem,
-                "path": str(file_path),
-                "metadata": data.get("metadata", {}),
-                "files": get_project_files(data)
-            }
+    file_path = _resolve_project(project_id)
+    if file_path is None:
+        raise HTTPException(status_code=404, detail=f"Project not found: {project_id}")
+    
+    # Weak ETag from the stat signature: a matching If-None-Match costs
+    # one stat and no JSON parse or body transfer at all
+    st = os.stat(file_path)
+    etag = f'W/"{st.st_size:x}-{st.st_mtime_ns:x}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
     
-    raise HTTPException(status_code=404, detail=f"Project not found: {project_id}")
+    data = _load_project_cached(str(file_path), st.st_mtime_ns)
+    response = _orjson_response({
+        "id": file_path.stem,
+        "path": str(file_path),
+        "metadata": data.get("metadata", {}),
+        "files": get_project_files(data)
+    })
+    response.headers.update(headers)
+    return response
 
 
 @router.get("/projects/{project_id}/files", tags=["Projects"])
@@ -239,32 +353,30 @@ async def list_project_files(project_id: str):
     }
     ```
     """
-    # Find project
-    for folder in [OUTPUT_DIR, MODIFIED_DIR]:
-        for pattern in [f"{project_id}.json", f"*{project_id}*.json"]:
-            matches = list(folder.glob(pattern))
-            if matches:
-                file_path = matches[0]
-                data = load_project(file_path)
-                
-                files_list = []
-                for path, file_data in data.get("project", {}).get("files", {}).items():
-                    if isinstance(file_data, dict):
-                        content = file_data.get("content", "")
-                    else:
-                        content = str(file_data)
-                    
-                    files_list.append({
-                        "path": path,
-                        "size": len(content)
-                    })
-                
-                return {
-                    "project_id": file_path.stem,
-                    "files": files_list
-                }
+    file_path, data = _resolve_and_load(project_id)
+    if file_path is None:
+        raise HTTPException(status_code=404, detail=f"Project not found: {project_id}")
     
-    raise HTTPException(status_code=404, detail=f"Project not found: {project_id}")
+    files_list = []
+    for path, file_data in data.get("project", {}).get("files", {}).items():
+        if isinstance(file_data, dict):
+            # Size is persisted at save time; len() is only a fallback
+            # for projects written before sizes were recorded.
+            size = file_data.get("size")
+            if size is None:
+                size = len(file_data.get("content", ""))
+        else:
+            size = len(str(file_data))
+        
+        files_list.append({
+            "path": path,
+            "size": size
+        })
+    
+    return {
+        "project_id": file_path.stem,
+        "files": files_list
+    }
 
 
 @router.get("/projects/{project_id}/files/{file_path:path}", tags=["Projects"])
@@ -287,33 +399,27 @@ async def get_project_file(project_id: str, file_path: str):
     }
     ```
     """
-    # Find project
-    for folder in [OUTPUT_DIR, MODIFIED_DIR]:
-        for pattern in [f"{project_id}.json", f"*{project_id}*.json"]:
-            matches = list(folder.glob(pattern))
-            if matches:
-                project_path = matches[0]
-                data = load_project(project_path)
-                
-                files = data.get("project", {}).get("files", {})
-                
-                if file_path not in files:
-                    raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
-                
-                file_data = files[file_path]
-                if isinstance(file_data, dict):
-                    content = file_data.get("content", "")
-                else:
-                    content = str(file_data)
-                
-                return {
-                    "project_id": project_path.stem,
-                    "file_path": file_path,
-                    "content": content,
-                    "size": len(content)
-                }
+    project_path, data = _resolve_and_load(project_id)
+    if project_path is None:
+        raise HTTPException(status_code=404, detail=f"Project not found: {project_id}")
+    
+    files = data.get("project", {}).get("files", {})
     
-    raise HTTPException(status_code=404, detail=f"Project not found: {project_id}")
+    if file_path not in files:
+        raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
+    
+    file_data = files[file_path]
+    if isinstance(file_data, dict):
+        content = file_data.get("content", "")
+    else:
+        content = str(file_data)
+    
+    return _orjson_response({
+        "project_id": project_path.stem,
+        "file_path": file_path,
+        "content": content,
+        "size": len(content)
+    })
 
 
 @router.delete("/projects/{project_id}", tags=["Projects"])
@@ -323,18 +429,14 @@ async def delete_project(project_id: str):
     
     **Warning:** This permanently deletes the project file.
     """
-    # Find and delete project
-    for folder in [OUTPUT_DIR, MODIFIED_DIR]:
-        for pattern in [f"{project_id}.json", f"*{project_id}*.json"]:
-            matches = list(folder.glob(pattern))
-            if matches:
-                file_path = matches[0]
-                file_path.unlink()
-                return {
-                    "success": True,
-                    "deleted": file_path.stem,
-                    "message": f"Project {file_path.stem} deleted"
-                }
+    file_path = _resolve_project(project_id)
+    if file_path is None:
+        raise HTTPException(status_code=404, detail=f"Project not found: {project_id}")
     
-    raise HTTPException(status_code=404, detail=f"Project not found: {project_id}")
+    file_path.unlink()
+    return {
+        "success": True,
+        "deleted": file_path.stem,
+        "message": f"Project {file_path.stem} deleted"
+    }
 
@@ -3,24 +3,30 @@ Unified API Endpoint - Single endpoint for all AI operations
 Supports multiple AI providers with GET and POST methods
 """
 
-import json
+import orjson
 import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, AsyncGenerator
-from queue import Queue
-from threading import Thread
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
 
-from api.schemas import UnifiedRequest, ModelFamily, EventType, ErrorResponse
+from api.schemas import (
+    UnifiedRequest, GenerateRequest, ModelFamily, EventType, ErrorResponse
+)
 
 # Import model router
-from models.model_router import create_provider
+from models.model_router import get_provider_cached, get_supported_providers
+
+# Import event emitter
+from events.stream_events import create_emitter
 
 # Import helpers from generate.py
 from api.routes.generate import (
+    _find_project_by_id,
     get_latest_project,
     get_next_version,
     validate_project,
@@ -33,6 +39,26 @@ from api.routes.generate import (
 
 router = APIRouter()
 
+# Shared worker pool for generation runs: threads are reused across
+# requests (a fresh Thread costs ~8 MB of stack apiece under load) and
+# the worker count caps how many generations run at once.
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("GEN_WORKERS", "16")),
+    thread_name_prefix="gen"
+)
+
+# SSE envelope, pre-encoded: yielding bytes skips the per-frame UTF-8
+# encode Starlette performs on str chunks.
+SSE_PREFIX = b"data: "
+SSE_SUFFIX = b"\n\n"
+
+
+def _log_generation_failure(future):
+    """Surface executor-level failures that escaped run_generation."""
+    exc = future.exception()
+    if exc is not None:
+        print(f"⚠️ Generation worker crashed: {exc}")
+
 
 # ==========================================================
 # UNIFIED SSE EVENT GENERATOR
@@ -45,7 +71,7 @@ async def unified_sse_events(
     model_name: str,
     project_id: Optional[str] = None,
     **kwargs
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     """
     Unified SSE event generator that works with any AI provider.
     
@@ -57,23 +83,28 @@ async def unified_sse_events(
         project_id: Required for modify operations
         **kwargs: Additional parameters (business_name, website_type, etc.)
     """
-    event_queue: Queue = Queue()
+    loop = asyncio.get_running_loop()
+    event_queue: asyncio.Queue = asyncio.Queue()
     result_holder = {"project": None, "error": None, "patch": None}
     
+    def enqueue_event(event_dict):
+        """Hand an event from the worker thread to the loop's queue."""
+        loop.call_soon_threadsafe(event_queue.put_nowait, event_dict)
+    
     def event_callback(event):
         """Callback that puts events in queue."""
-        event_dict = event.to_dict()
-        event_queue.put(event_dict)
+        enqueue_event(event.to_dict())
     
     def run_generation():
         """Run generation in a separate thread."""
         try:
-            # Import event emitter
-            from events.stream_events import create_emitter
-            emitter = create_emitter(callback=event_callback)
+            # Coalesce build.log / edit.start bursts into batch envelopes:
+            # this stream has no consumer-side coalescing, so each frame
+            # saved here is one fewer queue hop and SSE write.
+            emitter = create_emitter(callback=event_callback, batch_window_ms=50)
             
-            # Create AI provider
-            provider = create_provider(model_family, model_name)
+            # Reuse the pooled provider (shared SDK client per family/model)
+            provider = get_provider_cached(model_family, model_name)
             
             # Handle based on event type
             if event_type == EventType.MODIFY:
@@ -85,18 +116,13 @@ async def unified_sse_events(
                         raise ValueError("No existing project found to modify. Please provide project_id.")
                 else:
                     # Find specific project
-                    base_file = None
-                    for folder in [MODIFIED_DIR, OUTPUT_DIR]:
-                        matches = list(folder.glob(f"*{project_id}*.json"))
-                        if matches:
-                            base_file = matches[0]
-                            break
+                    base_file = _find_project_by_id(project_id)
                     if not base_file:
                         raise ValueError(f"Project not found: {project_id}")
                 
-                # Load project
-                with open(base_file, "r") as f:
-                    base_data = json.load(f)
+                # Load project (raw bytes straight into orjson — no
+                # intermediate str decode of a potentially large file)
+                base_data = orjson.loads(base_file.read_bytes())
                 base_project = {"project": base_data["project"]}
                 
                 # Generate patch
@@ -125,32 +151,27 @@ async def unified_sse_events(
                     "details": f"Model: {model_family}/{model_name}"
                 }
             }
-            event_queue.put(error_event)
+            enqueue_event(error_event)
         finally:
-            event_queue.put(None)  # Signal completion
+            enqueue_event(None)  # Signal completion
     
-    # Start generation in background thread
-    thread = Thread(target=run_generation)
-    thread.start()
+    # Run generation on the shared worker pool. The completion sentinel
+    # already guarantees run_generation's try/finally ran before the
+    # stream ends, so nothing waits on the future; the callback only
+    # reports anything truly unexpected from the executor.
+    future = _EXECUTOR.submit(run_generation)
+    future.add_done_callback(_log_generation_failure)
     
-    # Yield events as they come
+    # Yield events as they arrive — await blocks until the worker pushes,
+    # so there is no polling interval adding latency between events
     while True:
-        try:
-            await asyncio.sleep(0.01)
-            
-            if not event_queue.empty():
-                event = event_queue.get_nowait()
-                
-                if event is None:
-                    break
-                
-                # Yield SSE formatted event
-                yield f"data: {json.dumps(event)}\n\n"
-        except Exception:
-            await asyncio.sleep(0.05)
-    
-    # Wait for thread
-    thread.join(timeout=5.0)
+        event = await event_queue.get()
+        
+        if event is None:
+            break
+        
+        # Yield SSE formatted event
+        yield SSE_PREFIX + orjson.dumps(event) + SSE_SUFFIX
     
     # Handle errors
     if result_holder["error"]:
@@ -158,7 +179,7 @@ async def unified_sse_events(
             "event_type": "stream.failed",
             "payload": {"error": result_holder["error"]}
         }
-        yield f"data: {json.dumps(error_event)}\n\n"
+        yield SSE_PREFIX + orjson.dumps(error_event) + SSE_SUFFIX
         return
     
     # Save project
@@ -186,7 +207,7 @@ async def unified_sse_events(
                     "model_used": f"{model_family}/{model_name}"
                 }
             }
-            yield f"data: {json.dumps(saved_event)}\n\n"
+            yield SSE_PREFIX + orjson.dumps(saved_event) + SSE_SUFFIX
             
         elif result_holder["project"]:
             project = result_holder["project"]
@@ -203,14 +224,14 @@ async def unified_sse_events(
                     "model_used": f"{model_family}/{model_name}"
                 }
             }
-            yield f"data: {json.dumps(saved_event)}\n\n"
+            yield SSE_PREFIX + orjson.dumps(saved_event) + SSE_SUFFIX
             
     except Exception as e:
         error_event = {
             "event_type": "error",
             "payload": {"message": f"Failed to save: {str(e)}"}
         }
-        yield f"data: {json.dumps(error_event)}\n\n"
+        yield SSE_PREFIX + orjson.dumps(error_event) + SSE_SUFFIX
 
 
 # ==========================================================
@@ -284,7 +305,6 @@ async def unified_stream_get(
     # Build enhanced prompt if business details provided
     if business_name or website_type or color_scheme:
         # Create a pseudo-request object
-        from api.schemas import GenerateRequest
         request_obj = GenerateRequest(
             prompt=prompt,
             business_name=business_name,
@@ -375,16 +395,22 @@ async def unified_stream_post(request: UnifiedRequest):
     }
     ```
     """
-    # Build enhanced prompt
-    full_prompt = build_enhanced_prompt(request)
-    
+    # The tagged union gives us the branch that matched: only generate
+    # requests carry the detail fields, only modify requests a project_id.
+    if request.event_type == EventType.MODIFY:
+        full_prompt = request.prompt
+        project_id = request.project_id
+    else:
+        full_prompt = build_enhanced_prompt(request)
+        project_id = None
+
     return StreamingResponse(
         unified_sse_events(
             prompt=full_prompt,
             event_type=request.event_type,
             model_family=request.model_family,
             model_name=request.model_name,
-            project_id=request.project_id,
+            project_id=project_id,
         ),
         media_type="text/event-stream",
         headers={
@@ -420,34 +446,35 @@ async def list_supported_models():
     }
     ```
     """
-    from models.model_router import get_supported_providers
-    
-    providers = get_supported_providers()
-    
-    return {
-        "providers": providers,
-        "examples": {
-            "Anthropic": [
-                "claude-opus-4-5-20251101",
-                "claude-sonnet-4-20250514",
-                "claude-3-5-sonnet-20241022"
-            ],
-            "OpenAI": [
-                "gpt-4",
-                "gpt-5.2",
-                "gpt-4-turbo",
-                "gpt-3.5-turbo"
-            ],
-            "Google": [
-                "gemini-pro",
-                "gemini-1.5-pro"
-            ],
-            "Mistral": [
-                "mistral-large-latest",
-                "mistral-medium-latest"
-            ]
-        },
-        "note": "Google and Mistral providers are coming soon. Currently only Anthropic and OpenAI are fully supported."
-    }
+    return Response(content=_MODELS_BODY, media_type="application/json")
+
+
+# The model catalog is fixed for the life of the process, so the body is
+# serialized once at import and the endpoint is a memcpy.
+_MODELS_BODY = orjson.dumps({
+    "providers": get_supported_providers(),
+    "examples": {
+        "Anthropic": [
+            "claude-opus-4-5-20251101",
+            "claude-sonnet-4-20250514",
+            "claude-3-5-sonnet-20241022"
+        ],
+        "OpenAI": [
+            "gpt-4",
+            "gpt-5.2",
+            "gpt-4-turbo",
+            "gpt-3.5-turbo"
+        ],
+        "Google": [
+            "gemini-pro",
+            "gemini-1.5-pro"
+        ],
+        "Mistral": [
+            "mistral-large-latest",
+            "mistral-medium-latest"
+        ]
+    },
+    "note": "Google and Mistral providers are coming soon. Currently only Anthropic and OpenAI are fully supported."
+})
 
 
@@ -2,12 +2,35 @@
 Pydantic Schemas for API Request/Response Validation
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, Discriminator, Field, Tag
+from typing import Optional, List, Dict, Any, Annotated, Literal, Union
 from enum import Enum
 from datetime import datetime
 
 
+class _Schema(BaseModel):
+    """Shared base: defer pydantic-core schema builds to first use.
+
+    Building validators for every model at import time dominates this
+    module's cold-start cost; deferring moves it to the first request
+    that actually touches each model.
+    """
+    model_config = ConfigDict(defer_build=True)
+
+
+class _BodySchema(_Schema):
+    """Base for request-body models: these build eagerly.
+
+    FastAPI wraps a body model in Annotated[Model, FieldInfo(alias=...)]
+    for its parameter adapter; rebuilding a deferred model through that
+    wrapper trips pydantic's UnsupportedFieldAttributeWarning on every
+    schema build (worker boot, OpenAPI generation). The handful of body
+    models is a small slice of this module, so eager builds here keep
+    the cold-start win on the rest without shipping the warning.
+    """
+    model_config = ConfigDict(defer_build=False)
+
+
 # ==========================================================
 # ENUMS
 # ==========================================================
@@ -39,11 +62,88 @@ class IntentType(str, Enum):
     ILLEGAL = "illegal"
 
 
+
+# ==========================================================
+# JSON SCHEMA EXAMPLES
+# ==========================================================
+
+# Built once at import and shared by reference from json_schema_extra,
+# instead of a fresh literal per model config. (Not MappingProxyType:
+# pydantic deepcopies schema definitions, which mappingproxy rejects.)
+
+_GENERATE_EXAMPLE = {
+    "prompt": "Create a landing page for my coffee shop called 'Bean Dreams'",
+    "business_name": "Bean Dreams",
+    "tagline": "Where every cup tells a story",
+    "website_type": "Landing Page",
+    "color_scheme": "Modern Dark",
+    "key_features": ["Artisan Coffee", "Fresh Pastries", "Cozy Atmosphere"],
+    "sections": ["About Us", "Products/Services", "Contact Form"]
+}
+
+_MODIFY_EXAMPLE = {
+    "prompt": "Change the hero section text to 'Welcome to Paradise' and make the buttons blue",
+    "project_id": "project_v1_20250101_120000"
+}
+
+_CHAT_EXAMPLE = {
+    "message": "What frameworks do you support?",
+    "conversation_id": "conv_123"
+}
+
+_CLASSIFY_EXAMPLE = {
+    "text": "Hello! Can you create a website for my bakery?"
+}
+
+_UNIFIED_GENERATE_EXAMPLE = {
+    "prompt": "Create a landing page for a coffee shop",
+    "event_type": "generate",
+    "model_family": "Anthropic",
+    "model_name": "claude-opus-4-5-20251101",
+    "business_name": "Bean Dreams",
+    "website_type": "Landing Page"
+}
+
+_UNIFIED_MODIFY_EXAMPLE = {
+    "prompt": "Change the hero text to 'Welcome'",
+    "project_id": "project_v1_20250101_120000",
+    "event_type": "modify",
+    "model_family": "Anthropic",
+    "model_name": "claude-opus-4-5-20251101"
+}
+
+_PROJECT_EXAMPLE = {
+    "id": "project_v1_20250101_120000",
+    "metadata": {
+        "version": 1,
+        "timestamp": "20250101_120000",
+        "is_modification": False,
+        "created_at": "2025-01-01T12:00:00"
+    },
+    "files": {
+        "index.html": "<!DOCTYPE html>...",
+        "src/App.tsx": "export function App()..."
+    }
+}
+
+_STREAM_EVENT_EXAMPLE = {
+    "event_id": "evt_abc123",
+    "event_type": "progress.update",
+    "timestamp": "2025-01-01T12:00:00Z",
+    "project_id": "proj_123",
+    "conversation_id": "conv_456",
+    "payload": {
+        "step_id": "code",
+        "status": "in_progress"
+    }
+}
+
+
 # ==========================================================
 # REQUEST SCHEMAS
 # ==========================================================
 
-class GenerateRequest(BaseModel):
+class GenerateRequest(_BodySchema):
     """Request body for generating a new project."""
     prompt: str = Field(..., description="User's request describing what to build", min_length=1)
     
@@ -58,59 +158,31 @@ class GenerateRequest(BaseModel):
     phone: Optional[str] = Field(None, description="Contact phone")
     additional_info: Optional[str] = Field(None, description="Additional requirements")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "prompt": "Create a landing page for my coffee shop called 'Bean Dreams'",
-                "business_name": "Bean Dreams",
-                "tagline": "Where every cup tells a story",
-                "website_type": "Landing Page",
-                "color_scheme": "Modern Dark",
-                "key_features": ["Artisan Coffee", "Fresh Pastries", "Cozy Atmosphere"],
-                "sections": ["About Us", "Products/Services", "Contact Form"]
-            }
-        }
-
-
-class ModifyRequest(BaseModel):
+    model_config = ConfigDict(json_schema_extra={"example": _GENERATE_EXAMPLE})
+
+
+class ModifyRequest(_BodySchema):
     """Request body for modifying an existing project."""
     prompt: str = Field(..., description="Description of modifications to make", min_length=1)
     project_id: Optional[str] = Field(None, description="ID of project to modify. If not provided, uses latest project.")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "prompt": "Change the hero section text to 'Welcome to Paradise' and make the buttons blue",
-                "project_id": "project_v1_20250101_120000"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": _MODIFY_EXAMPLE})
 
 
-class ChatRequest(BaseModel):
+class ChatRequest(_BodySchema):
     """Request body for chat messages."""
     message: str = Field(..., description="User's message", min_length=1)
     conversation_id: Optional[str] = Field(None, description="Conversation ID for context")
     history: Optional[List[Dict[str, str]]] = Field(None, description="Previous messages for context")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "message": "What frameworks do you support?",
-                "conversation_id": "conv_123"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": _CHAT_EXAMPLE})
 
 
-class ClassifyRequest(BaseModel):
+class ClassifyRequest(_BodySchema):
     """Request body for intent classification."""
     text: str = Field(..., description="Text to classify", min_length=1)
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "text": "Hello! Can you create a website for my bakery?"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": _CLASSIFY_EXAMPLE})
 
 
 class ModelFamily(str, Enum):
@@ -127,15 +199,18 @@ class EventType(str, Enum):
     MODIFY = "modify"
 
 
-class UnifiedRequest(BaseModel):
-    """Unified request schema for all AI operations."""
+class _UnifiedBase(_BodySchema):
+    """Fields shared by both unified operations."""
     prompt: str = Field(..., description="User's request or modification prompt", min_length=1)
-    project_id: Optional[str] = Field(None, description="Project ID (required for modify event_type)")
-    event_type: EventType = Field(EventType.GENERATE, description="Operation type: generate or modify")
     model_family: ModelFamily = Field(ModelFamily.ANTHROPIC, description="AI provider to use")
     model_name: str = Field("claude-opus-4-5-20251101", description="Specific model name")
-    
-    # Optional detailed requirements (for generation)
+
+
+class UnifiedGenerateRequest(_UnifiedBase):
+    """Unified request for generating a new project."""
+    event_type: Literal[EventType.GENERATE] = EventType.GENERATE
+
+    # Optional detailed requirements
     business_name: Optional[str] = Field(None, description="Business or website name")
     tagline: Optional[str] = Field(None, description="Tagline or main message")
     website_type: Optional[WebsiteType] = Field(None, description="Type of website")
@@ -145,26 +220,43 @@ class UnifiedRequest(BaseModel):
     email: Optional[str] = Field(None, description="Contact email")
     phone: Optional[str] = Field(None, description="Contact phone")
     additional_info: Optional[str] = Field(None, description="Additional requirements")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "prompt": "Create a landing page for a coffee shop",
-                "project_id": None,
-                "event_type": "generate",
-                "model_family": "Anthropic",
-                "model_name": "claude-opus-4-5-20251101",
-                "business_name": "Bean Dreams",
-                "website_type": "Landing Page"
-            }
-        }
+
+    model_config = ConfigDict(json_schema_extra={"example": _UNIFIED_GENERATE_EXAMPLE})
+
+
+class UnifiedModifyRequest(_UnifiedBase):
+    """Unified request for modifying an existing project."""
+    event_type: Literal[EventType.MODIFY]
+    project_id: Optional[str] = Field(None, description="ID of project to modify. If not provided, uses latest project.")
+
+    model_config = ConfigDict(json_schema_extra={"example": _UNIFIED_MODIFY_EXAMPLE})
+
+
+def _unified_event_tag(value: Any) -> str:
+    """Extract the event_type tag, defaulting absent values to generate."""
+    if isinstance(value, dict):
+        return value.get("event_type") or EventType.GENERATE.value
+    return getattr(value, "event_type", EventType.GENERATE)
+
+
+# Tagged union: pydantic-core dispatches on event_type and validates only
+# the matching branch, so modify requests never touch the generation-only
+# fields. The callable discriminator keeps the legacy default of treating
+# bodies without an event_type as generate requests.
+UnifiedRequest = Annotated[
+    Union[
+        Annotated[UnifiedGenerateRequest, Tag("generate")],
+        Annotated[UnifiedModifyRequest, Tag("modify")],
+    ],
+    Discriminator(_unified_event_tag),
+]
 
 
 # ==========================================================
 # RESPONSE SCHEMAS
 # ==========================================================
 
-class ProjectMetadata(BaseModel):
+class ProjectMetadata(_Schema):
     """Metadata for a project."""
     version: int
     timestamp: str
@@ -176,38 +268,23 @@ class ProjectMetadata(BaseModel):
     created_at: str
 
 
-class ProjectFile(BaseModel):
+class ProjectFile(_Schema):
     """A single file in a project."""
     path: str
     content: str
     language: Optional[str] = None
 
 
-class ProjectResponse(BaseModel):
+class ProjectResponse(_Schema):
     """Response containing a project."""
     id: str = Field(..., description="Project ID (filename)")
     metadata: ProjectMetadata
     files: Dict[str, str] = Field(..., description="Map of file paths to content")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "id": "project_v1_20250101_120000",
-                "metadata": {
-                    "version": 1,
-                    "timestamp": "20250101_120000",
-                    "is_modification": False,
-                    "created_at": "2025-01-01T12:00:00"
-                },
-                "files": {
-                    "index.html": "<!DOCTYPE html>...",
-                    "src/App.tsx": "export function App()..."
-                }
-            }
-        }
-
-
-class ProjectListItem(BaseModel):
+    model_config = ConfigDict(json_schema_extra={"example": _PROJECT_EXAMPLE})
+
+
+class ProjectListItem(_Schema):
     """Summary of a project for listing."""
     id: str
     version: int
@@ -216,26 +293,26 @@ class ProjectListItem(BaseModel):
     file_count: int
 
 
-class ProjectListResponse(BaseModel):
+class ProjectListResponse(_Schema):
     """Response containing list of projects."""
     total: int
     projects: List[ProjectListItem]
 
 
-class ClassifyResponse(BaseModel):
+class ClassifyResponse(_Schema):
     """Response from intent classification."""
     intent: IntentType
     confidence: float = Field(..., ge=0.0, le=1.0)
     explanation: str
 
 
-class ChatResponse(BaseModel):
+class ChatResponse(_Schema):
     """Response from chat endpoint."""
     message: str
     conversation_id: Optional[str] = None
 
 
-class HealthResponse(BaseModel):
+class HealthResponse(_Schema):
     """Health check response."""
     status: str = "healthy"
     version: str = "1.0.0"
@@ -246,7 +323,7 @@ class HealthResponse(BaseModel):
 # EVENT SCHEMAS (for SSE streaming)
 # ==========================================================
 
-class StreamEvent(BaseModel):
+class StreamEvent(_Schema):
     """Universal event envelope for SSE streaming."""
     event_id: str
     event_type: str
@@ -255,23 +332,10 @@ class StreamEvent(BaseModel):
     conversation_id: str
     payload: Dict[str, Any]
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "event_id": "evt_abc123",
-                "event_type": "progress.update",
-                "timestamp": "2025-01-01T12:00:00Z",
-                "project_id": "proj_123",
-                "conversation_id": "conv_456",
-                "payload": {
-                    "step_id": "code",
-                    "status": "in_progress"
-                }
-            }
-        }
-
-
-class ErrorResponse(BaseModel):
+    model_config = ConfigDict(json_schema_extra={"example": _STREAM_EVENT_EXAMPLE})
+
+
+class ErrorResponse(_Schema):
     """Error response."""
     error: str
     detail: Optional[str] = None
@@ -6,8 +6,13 @@ This module defines all streaming events as per the Phase1_LLM_Streaming_Contrac
 Events keep users engaged during webpage generation with real-time feedback.
 """
 
+import sys
 import uuid
 import time
+import functools
+from collections import defaultdict, deque
+import orjson
+import itertools
 from datetime import datetime
 from dataclasses import dataclass, field, asdict
 from typing import List, Dict, Optional, Any, Callable
@@ -32,6 +37,7 @@ class EventType(str, Enum):
     # Filesystem
     FS_CREATE = "fs.create"
     FS_WRITE = "fs.write"
+    FS_FILE_WRITTEN = "fs.file_written"
     FS_DELETE = "fs.delete"
     
     # Edit Timeline
@@ -61,6 +67,7 @@ class EventType(str, Enum):
     STREAM_COMPLETE = "stream.complete"
     STREAM_AWAIT_INPUT = "stream.await_input"
     STREAM_FAILED = "stream.failed"
+    STREAM_BATCH = "stream.batch"
 
 
 class ProgressStatus(str, Enum):
@@ -71,11 +78,82 @@ class ProgressStatus(str, Enum):
     SKIPPED = "skipped"
 
 
+# Event-type strings bound once at import: every emit otherwise pays an
+# enum descriptor lookup for .value on the hot path.
+_ET_BUILD_ERROR = EventType.BUILD_ERROR.value
+_ET_BUILD_LOG = EventType.BUILD_LOG.value
+_ET_BUILD_START = EventType.BUILD_START.value
+_ET_CHAT_MESSAGE = EventType.CHAT_MESSAGE.value
+_ET_EDIT_END = EventType.EDIT_END.value
+_ET_EDIT_READ = EventType.EDIT_READ.value
+_ET_EDIT_SECURITY_CHECK = EventType.EDIT_SECURITY_CHECK.value
+_ET_EDIT_START = EventType.EDIT_START.value
+_ET_ERROR = EventType.ERROR.value
+_ET_FS_CREATE = EventType.FS_CREATE.value
+_ET_FS_DELETE = EventType.FS_DELETE.value
+_ET_FS_FILE_WRITTEN = EventType.FS_FILE_WRITTEN.value
+_ET_FS_WRITE = EventType.FS_WRITE.value
+_ET_PREVIEW_READY = EventType.PREVIEW_READY.value
+_ET_PROGRESS_INIT = EventType.PROGRESS_INIT.value
+_ET_PROGRESS_TRANSITION = EventType.PROGRESS_TRANSITION.value
+_ET_PROGRESS_UPDATE = EventType.PROGRESS_UPDATE.value
+_ET_STREAM_AWAIT_INPUT = EventType.STREAM_AWAIT_INPUT.value
+_ET_STREAM_COMPLETE = EventType.STREAM_COMPLETE.value
+_ET_STREAM_BATCH = EventType.STREAM_BATCH.value
+_ET_STREAM_FAILED = EventType.STREAM_FAILED.value
+_ET_SUGGESTION = EventType.SUGGESTION.value
+_ET_THINKING_END = EventType.THINKING_END.value
+_ET_THINKING_START = EventType.THINKING_START.value
+_ET_UI_MULTISELECT = EventType.UI_MULTISELECT.value
+_ET_VERSION_CREATED = EventType.VERSION_CREATED.value
+_ET_VERSION_DEPLOYED = EventType.VERSION_DEPLOYED.value
+
+
 # ==========================================================
 # EVENT DATA CLASSES
 # ==========================================================
 
-@dataclass
+# Envelope keys, interned: cached hash + pointer-equality dict inserts
+# for the six keys every single event re-uses.
+_K_EVENT_ID = sys.intern("event_id")
+_K_EVENT_TYPE = sys.intern("event_type")
+_K_TIMESTAMP = sys.intern("timestamp")
+_K_PROJECT_ID = sys.intern("project_id")
+_K_CONVERSATION_ID = sys.intern("conversation_id")
+_K_PAYLOAD = sys.intern("payload")
+
+# Event ids only need per-process uniqueness; a counter skips the
+# 128-bit RNG draw that dominates uuid4's cost. itertools.count is
+# atomic under the GIL, so emitter threads can share it.
+_event_seq = itertools.count(1)
+
+
+def _next_event_id() -> str:
+    return f"evt_{next(_event_seq):08x}"
+
+
+# Millisecond timestamps without per-event datetime formatting: the
+# "YYYY-MM-DDTHH:MM:SS." prefix is rebuilt once per wall-clock second
+# and only the three millisecond digits are interpolated per event.
+_ts_cache = (0, "")
+
+
+def _now_iso() -> str:
+    global _ts_cache
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _ts_cache
+    if second != cached_second:
+        prefix = datetime.utcfromtimestamp(second).isoformat() + "."
+        _ts_cache = (second, prefix)
+    return f"{prefix}{int((now - second) * 1000):03d}Z"
+
+
+def _noop(_event: "StreamEvent") -> None:
+    """Dispatch target when no callback is registered."""
+
+
+@dataclass(slots=True)
 class ProgressStep:
     id: str
     label: str
@@ -85,26 +163,42 @@ class ProgressStep:
         return {"id": self.id, "label": self.label, "status": self.status}
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamEvent:
     """Universal Event Envelope"""
     event_type: str
     payload: Dict[str, Any]
-    event_id: str = field(default_factory=lambda: f"evt_{uuid.uuid4().hex[:8]}")
-    timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
+    event_id: str = field(default_factory=_next_event_id)
+    timestamp: str = field(default_factory=_now_iso)
     project_id: str = "proj_current"
     conversation_id: str = "conv_current"
+    _cached_bytes: Optional[bytes] = field(default=None, repr=False, compare=False)
     
     def to_dict(self) -> Dict:
         return {
-            "event_id": self.event_id,
-            "event_type": self.event_type,
-            "timestamp": self.timestamp,
-            "project_id": self.project_id,
-            "conversation_id": self.conversation_id,
-            "payload": self.payload
+            _K_EVENT_ID: self.event_id,
+            _K_EVENT_TYPE: self.event_type,
+            _K_TIMESTAMP: self.timestamp,
+            _K_PROJECT_ID: self.project_id,
+            _K_CONVERSATION_ID: self.conversation_id,
+            _K_PAYLOAD: self.payload
         }
 
+    def to_bytes(self) -> bytes:
+        """Serialized event envelope, memoized on the instance.
+
+        Events fan out to history, callbacks and (eventually) the SSE
+        socket; memoizing means N consumers share one orjson encoding.
+        orjson serializes the dataclass directly (underscore fields are
+        skipped), so no intermediate dict is built. Only call once the
+        event is final — the cache is not refreshed.
+        """
+        cached = self._cached_bytes
+        if cached is None:
+            cached = orjson.dumps(self)
+            self._cached_bytes = cached
+        return cached
+
 
 # ==========================================================
 # EVENT EMITTER CLASS
@@ -116,44 +210,126 @@ class StreamEventEmitter:
     Collects events and provides callbacks for real-time UI updates.
     """
     
-    # Default progress steps for a new build
-    DEFAULT_STEPS = [
-        ProgressStep("plan", "Planning"),
-        ProgressStep("scaffold", "Scaffolding"),
-        ProgressStep("deps", "Dependencies"),
-        ProgressStep("code", "Code Generation"),
-        ProgressStep("build", "Build"),
-        ProgressStep("verify", "Verification"),
-    ]
-    
-    def __init__(self, callback: Optional[Callable[[StreamEvent], None]] = None):
+    # Fixed attribute layout: no per-instance __dict__, faster attribute
+    # access, and less GC pressure for high-volume emitters
+    __slots__ = (
+        "events", "callback", "_dispatch", "thinking_start_time", "current_step",
+        "steps", "_steps_by_id", "project_id", "conversation_id",
+        "_history_limit", "batch_window_ms", "_batch_type",
+        "_batch_chunks", "_batch_deadline", "_by_type",
+    )
+    
+    # Burst-prone event types that may be coalesced into one envelope
+    _BATCHABLE = frozenset((_ET_BUILD_LOG, _ET_EDIT_START))
+    
+    # Immutable (id, label) templates for a new build. progress_init
+    # always constructs fresh "pending" steps from these, so there is no
+    # shared mutable state to defensively re-copy.
+    _DEFAULT_STEP_TEMPLATES = (
+        ("plan", "Planning"),
+        ("scaffold", "Scaffolding"),
+        ("deps", "Dependencies"),
+        ("code", "Code Generation"),
+        ("build", "Build"),
+        ("verify", "Verification"),
+    )
+    
+    # Indexable default steps for callers picking a subset (the model
+    # clients index into this); a tuple, so the set itself can't drift
+    DEFAULT_STEPS = tuple(
+        ProgressStep(step_id, label) for step_id, label in _DEFAULT_STEP_TEMPLATES
+    )
+    
+    def __init__(self, callback: Optional[Callable[[StreamEvent], None]] = None,
+                 history_limit: Optional[int] = None,
+                 batch_window_ms: int = 0):
         """
         Initialize the event emitter.
         
         Args:
             callback: Optional function called for each emitted event.
                      Used for real-time UI updates.
+            history_limit: Keep only the most recent N events. Long
+                     streams otherwise retain every payload (including
+                     full file contents) for the build's lifetime.
+            batch_window_ms: Coalesce bursts of build.log / edit.start
+                     into one <type>.batch envelope, flushed after this
+                     window or before any other event. 0 disables.
         """
-        self.events: List[StreamEvent] = []
+        self._history_limit = history_limit
+        self.events = deque(maxlen=history_limit) if history_limit else []
+        self._by_type: Dict[str, List[StreamEvent]] = defaultdict(list)
         self.callback = callback
+        # Resolved once: _emit calls this unconditionally instead of
+        # testing callback truthiness on every event
+        self._dispatch = callback if callback else _noop
+        self.batch_window_ms = batch_window_ms
+        self._batch_type: Optional[str] = None
+        self._batch_chunks: List[Dict[str, Any]] = []
+        self._batch_deadline = 0.0
         self.thinking_start_time: Optional[float] = None
         self.current_step: Optional[str] = None
         self.steps: List[ProgressStep] = []
+        self._steps_by_id: Dict[str, ProgressStep] = {}
         self.project_id = f"proj_{uuid.uuid4().hex[:6]}"
         self.conversation_id = f"conv_{uuid.uuid4().hex[:6]}"
     
-    def _emit(self, event_type: EventType, payload: Dict[str, Any]) -> StreamEvent:
-        """Internal method to emit an event."""
+    def _flush_batch(self) -> Optional[StreamEvent]:
+        """Emit any buffered burst events as a single batch envelope."""
+        if not self._batch_chunks:
+            return None
+        batch_type, chunks = self._batch_type, self._batch_chunks
+        self._batch_type, self._batch_chunks = None, []
+        if len(chunks) == 1:
+            return self._emit(batch_type, chunks[0])
+        return self._emit(f"{batch_type}.batch", {"chunks": chunks})
+    
+    def _emit_batched(self, event_type: str, payload: Dict[str, Any]) -> Optional[StreamEvent]:
+        """Buffer a burst-prone event, flushing when the window elapses.
+
+        Returns the flushed event when one was emitted, else None (the
+        payload is held in the buffer).
+        """
+        if not self.batch_window_ms:
+            return self._emit(event_type, payload)
+        now = time.monotonic()
+        if event_type != self._batch_type:
+            flushed = self._flush_batch()
+            self._batch_type = event_type
+            self._batch_deadline = now + self.batch_window_ms / 1000.0
+            self._batch_chunks.append(payload)
+            return flushed
+        self._batch_chunks.append(payload)
+        if now >= self._batch_deadline:
+            return self._flush_batch()
+        return None
+    
+    def _emit(self, event_type: str, payload: Dict[str, Any]) -> StreamEvent:
+        """Internal method to emit an event (takes the raw type string)."""
+        # Preserve ordering: buffered bursts go out before anything else
+        if self._batch_chunks and event_type not in self._BATCHABLE:
+            self._flush_batch()
         event = StreamEvent(
-            event_type=event_type.value,
+            event_type=event_type,
             payload=payload,
             project_id=self.project_id,
             conversation_id=self.conversation_id
         )
-        self.events.append(event)
+        # Keep the per-type index in step with the history. When a bounded
+        # deque is about to evict, the evicted event is the globally
+        # oldest, hence also the head of its own bucket.
+        events = self.events
+        evicted = None
+        if self._history_limit and len(events) == self._history_limit:
+            evicted = events[0]
+        events.append(event)
+        self._by_type[event_type].append(event)
+        if evicted is not None:
+            bucket = self._by_type[evicted.event_type]
+            if bucket and bucket[0] is evicted:
+                del bucket[0]
         
-        if self.callback:
-            self.callback(event)
+        self._dispatch(event)
         
         return event
     
@@ -164,14 +340,14 @@ class StreamEventEmitter:
     def thinking_start(self) -> StreamEvent:
         """Emit thinking.start - Show 'Thinking...' indicator."""
         self.thinking_start_time = time.time()
-        return self._emit(EventType.THINKING_START, {})
+        return self._emit(_ET_THINKING_START, {})
     
     def thinking_end(self) -> StreamEvent:
         """Emit thinking.end - Show 'Thought for X seconds'."""
         duration_ms = 0
         if self.thinking_start_time:
             duration_ms = int((time.time() - self.thinking_start_time) * 1000)
-        return self._emit(EventType.THINKING_END, {"duration_ms": duration_ms})
+        return self._emit(_ET_THINKING_END, {"duration_ms": duration_ms})
     
     # ==========================================================
     # CHAT EVENTS
@@ -179,7 +355,7 @@ class StreamEventEmitter:
     
     def chat_message(self, content: str) -> StreamEvent:
         """Emit chat.message - Human-readable narration."""
-        return self._emit(EventType.CHAT_MESSAGE, {"content": content})
+        return self._emit(_ET_CHAT_MESSAGE, {"content": content})
     
     # ==========================================================
     # PROGRESS EVENTS
@@ -193,14 +369,18 @@ class StreamEventEmitter:
             mode: "modal" or "inline"
             steps: List of progress steps. Uses defaults if not provided.
         """
-        # IMPORTANT: Always create NEW steps with "pending" status
-        # Don't copy status from DEFAULT_STEPS as they may have been modified
+        # Always create NEW steps with "pending" status so reruns never
+        # inherit state from a previous build
         if steps:
             self.steps = [ProgressStep(s.id, s.label, "pending") for s in steps]
         else:
-            self.steps = [ProgressStep(s.id, s.label, "pending") for s in self.DEFAULT_STEPS]
+            self.steps = [
+                ProgressStep(step_id, label)
+                for step_id, label in self._DEFAULT_STEP_TEMPLATES
+            ]
+        self._steps_by_id = {s.id: s for s in self.steps}
         
-        return self._emit(EventType.PROGRESS_INIT, {
+        return self._emit(_ET_PROGRESS_INIT, {
             "mode": mode,
             "steps": [s.to_dict() for s in self.steps]
         })
@@ -213,21 +393,20 @@ class StreamEventEmitter:
             step_id: ID of the step to update
             status: New status (pending, in_progress, completed, failed)
         """
-        # Update internal state
-        for step in self.steps:
-            if step.id == step_id:
-                step.status = status
-                break
+        # Update internal state (O(1) via the id index)
+        step = self._steps_by_id.get(step_id)
+        if step is not None:
+            step.status = status
         
         self.current_step = step_id if status == "in_progress" else self.current_step
-        return self._emit(EventType.PROGRESS_UPDATE, {
+        return self._emit(_ET_PROGRESS_UPDATE, {
             "step_id": step_id,
             "status": status
         })
     
     def progress_transition(self, mode: str) -> StreamEvent:
         """Emit progress.transition - Transition from modal to inline."""
-        return self._emit(EventType.PROGRESS_TRANSITION, {"mode": mode})
+        return self._emit(_ET_PROGRESS_TRANSITION, {"mode": mode})
     
     # ==========================================================
     # FILESYSTEM EVENTS
@@ -241,7 +420,7 @@ class StreamEventEmitter:
             path: Path to create
             kind: "folder" or "file"
         """
-        return self._emit(EventType.FS_CREATE, {
+        return self._emit(_ET_FS_CREATE, {
             "path": path,
             "kind": kind
         })
@@ -256,16 +435,35 @@ class StreamEventEmitter:
             content: File content (full content, not truncated)
             language: Programming language
         """
-        return self._emit(EventType.FS_WRITE, {
+        return self._emit(_ET_FS_WRITE, {
             "path": path,
             "kind": "file",
             "language": language,
             "content": content
         })
     
+    def emit_file_written(self, path: str, content: str, language: str = "typescript",
+                          duration_ms: int = 0, security_status: str = "passed") -> StreamEvent:
+        """
+        Emit fs.file_written - composite event for one completed file.
+        
+        Folds the per-file burst (chat.message, edit.read, edit.start,
+        fs.write, edit.end, edit.security_check) into a single envelope,
+        so writing N files costs N dispatches instead of ~6N. The
+        payload carries everything the individual events did.
+        """
+        return self._emit(_ET_FS_FILE_WRITTEN, {
+            "path": path,
+            "kind": "file",
+            "language": language,
+            "content": content,
+            "duration_ms": duration_ms,
+            "security_status": security_status
+        })
+    
     def fs_delete(self, path: str) -> StreamEvent:
         """Emit fs.delete - Delete a file."""
-        return self._emit(EventType.FS_DELETE, {"path": path})
+        return self._emit(_ET_FS_DELETE, {"path": path})
     
     # ==========================================================
     # EDIT TIMELINE EVENTS
@@ -273,28 +471,29 @@ class StreamEventEmitter:
     
     def edit_read(self, path: str) -> StreamEvent:
         """Emit edit.read - Reading a file."""
-        return self._emit(EventType.EDIT_READ, {"path": path})
+        return self._emit(_ET_EDIT_READ, {"path": path})
     
-    def edit_start(self, path: str, content: str = "") -> StreamEvent:
+    def edit_start(self, path: str, content: str = "") -> Optional[StreamEvent]:
         """
         Emit edit.start - Start editing a file.
-        Can be emitted multiple times for typing animation.
+        Can be emitted multiple times for typing animation; with
+        batching enabled, bursts coalesce into edit.start.batch.
         """
-        return self._emit(EventType.EDIT_START, {
+        return self._emit_batched(_ET_EDIT_START, {
             "path": path,
             "content": content
         })
     
     def edit_end(self, path: str, duration_ms: int) -> StreamEvent:
         """Emit edit.end - Finished editing a file."""
-        return self._emit(EventType.EDIT_END, {
+        return self._emit(_ET_EDIT_END, {
             "path": path,
             "duration_ms": duration_ms
         })
     
     def edit_security_check(self, path: str, status: str = "passed") -> StreamEvent:
         """Emit edit.security_check - Security validation result."""
-        return self._emit(EventType.EDIT_SECURITY_CHECK, {
+        return self._emit(_ET_EDIT_SECURITY_CHECK, {
             "path": path,
             "status": status
         })
@@ -305,25 +504,27 @@ class StreamEventEmitter:
     
     def build_start(self, container_id: str = "ctr_001") -> StreamEvent:
         """Emit build.start - Build process started."""
-        return self._emit(EventType.BUILD_START, {"container_id": container_id})
+        return self._emit(_ET_BUILD_START, {"container_id": container_id})
     
-    def build_log(self, message: str, level: str = "info") -> StreamEvent:
-        """Emit build.log - Build log message."""
-        return self._emit(EventType.BUILD_LOG, {
+    def build_log(self, message: str, level: str = "info") -> Optional[StreamEvent]:
+        """Emit build.log - Build log message.
+        With batching enabled, bursts coalesce into build.log.batch.
+        """
+        return self._emit_batched(_ET_BUILD_LOG, {
             "level": level,
             "message": message
         })
     
     def build_error(self, message: str, details: str = "") -> StreamEvent:
         """Emit build.error - Build failed."""
-        return self._emit(EventType.BUILD_ERROR, {
+        return self._emit(_ET_BUILD_ERROR, {
             "message": message,
             "details": details
         })
     
     def preview_ready(self, url: str, port: int = 5173) -> StreamEvent:
         """Emit preview.ready - Preview URL is available."""
-        return self._emit(EventType.PREVIEW_READY, {
+        return self._emit(_ET_PREVIEW_READY, {
             "url": url,
             "port": port
         })
@@ -334,7 +535,7 @@ class StreamEventEmitter:
     
     def version_created(self, version_id: str, label: str = "", status: str = "stable") -> StreamEvent:
         """Emit version.created - New version created."""
-        return self._emit(EventType.VERSION_CREATED, {
+        return self._emit(_ET_VERSION_CREATED, {
             "version_id": version_id,
             "label": label,
             "status": status
@@ -342,7 +543,7 @@ class StreamEventEmitter:
     
     def version_deployed(self, version_id: str, environment: str = "preview") -> StreamEvent:
         """Emit version.deployed - Version deployed."""
-        return self._emit(EventType.VERSION_DEPLOYED, {
+        return self._emit(_ET_VERSION_DEPLOYED, {
             "version_id": version_id,
             "environment": environment
         })
@@ -353,7 +554,7 @@ class StreamEventEmitter:
     
     def suggestion(self, id: str, label: str, options: List[str]) -> StreamEvent:
         """Emit suggestion - Show next action suggestions."""
-        return self._emit(EventType.SUGGESTION, {
+        return self._emit(_ET_SUGGESTION, {
             "id": id,
             "label": label,
             "options": options
@@ -361,7 +562,7 @@ class StreamEventEmitter:
     
     def ui_multiselect(self, id: str, title: str, options: List[Dict[str, str]]) -> StreamEvent:
         """Emit ui.multiselect - Show multi-select modal."""
-        return self._emit(EventType.UI_MULTISELECT, {
+        return self._emit(_ET_UI_MULTISELECT, {
             "id": id,
             "title": title,
             "options": options
@@ -374,7 +575,7 @@ class StreamEventEmitter:
     def error(self, message: str, scope: str = "llm", details: str = "", 
               actions: Optional[List[str]] = None) -> StreamEvent:
         """Emit error - Error occurred."""
-        return self._emit(EventType.ERROR, {
+        return self._emit(_ET_ERROR, {
             "scope": scope,
             "message": message,
             "details": details,
@@ -385,17 +586,29 @@ class StreamEventEmitter:
     # STREAM LIFECYCLE EVENTS
     # ==========================================================
     
-    def stream_complete(self) -> StreamEvent:
-        """Emit stream.complete - Stream finished successfully."""
-        return self._emit(EventType.STREAM_COMPLETE, {})
+    def stream_complete(self, batch_pending: bool = False) -> StreamEvent:
+        """Emit stream.complete - Stream finished successfully.
+
+        With batch_pending=True, burst events still sitting in the batch
+        buffer ride along inside one stream.batch envelope together with
+        the completion, instead of a flush frame plus a completion frame.
+        Per-event granularity is preserved in the payload's events list.
+        """
+        if batch_pending and self._batch_chunks:
+            batch_type, chunks = self._batch_type, self._batch_chunks
+            self._batch_type, self._batch_chunks = None, []
+            pending = [{"event_type": batch_type, "payload": c} for c in chunks]
+            pending.append({"event_type": _ET_STREAM_COMPLETE, "payload": {}})
+            return self._emit(_ET_STREAM_BATCH, {"events": pending})
+        return self._emit(_ET_STREAM_COMPLETE, {})
     
     def stream_await_input(self, reason: str = "suggestion") -> StreamEvent:
         """Emit stream.await_input - Waiting for user input."""
-        return self._emit(EventType.STREAM_AWAIT_INPUT, {"reason": reason})
+        return self._emit(_ET_STREAM_AWAIT_INPUT, {"reason": reason})
     
     def stream_failed(self) -> StreamEvent:
         """Emit stream.failed - Stream failed."""
-        return self._emit(EventType.STREAM_FAILED, {})
+        return self._emit(_ET_STREAM_FAILED, {})
     
     # ==========================================================
     # UTILITY METHODS
@@ -404,14 +617,25 @@ class StreamEventEmitter:
     def get_all_events(self) -> List[Dict]:
         """Get all events as dictionaries."""
         return [e.to_dict() for e in self.events]
-    
+
+    def get_all_events_json_bytes(self) -> bytes:
+        """Get all events as a single JSON array, pre-encoded.
+
+        Joins each event's cached orjson bytes directly, so a full
+        history snapshot costs one join instead of rebuilding a dict per
+        event and re-serializing the lot. Hand the result straight to
+        `Response(content=..., media_type="application/json")`.
+        """
+        return b"[" + b",".join(e.to_bytes() for e in self.events) + b"]"
+
     def get_events_by_type(self, event_type: EventType) -> List[StreamEvent]:
-        """Get events filtered by type."""
-        return [e for e in self.events if e.event_type == event_type.value]
+        """Get events filtered by type (O(1) via the per-type index)."""
+        return self._by_type.get(event_type.value, [])
     
     def clear(self):
         """Clear all events."""
-        self.events = []
+        self.events = deque(maxlen=self._history_limit) if self._history_limit else []
+        self._by_type = defaultdict(list)
         self.thinking_start_time = None
         self.current_step = None
 
@@ -420,30 +644,35 @@ class StreamEventEmitter:
 # HELPER FUNCTION FOR FILE LANGUAGE DETECTION
 # ==========================================================
 
+_EXT_MAP = {
+    "tsx": "typescript",
+    "ts": "typescript",
+    "jsx": "javascript",
+    "js": "javascript",
+    "css": "css",
+    "html": "html",
+    "json": "json",
+    "py": "python",
+    "md": "markdown",
+}
+
+
+@functools.lru_cache(maxsize=1024)
 def detect_language(path: str) -> str:
     """Detect programming language from file path."""
-    ext_map = {
-        ".tsx": "typescript",
-        ".ts": "typescript",
-        ".jsx": "javascript",
-        ".js": "javascript",
-        ".css": "css",
-        ".html": "html",
-        ".json": "json",
-        ".py": "python",
-        ".md": "markdown",
-    }
-    for ext, lang in ext_map.items():
-        if path.endswith(ext):
-            return lang
-    return "plaintext"
+    # rpartition is one C-level scan from the end; the old loop ran up
+    # to nine endswith checks per fs.write
+    return _EXT_MAP.get(path.rpartition(".")[2], "plaintext")
 
 
 # ==========================================================
 # CONVENIENCE FUNCTION FOR QUICK SETUP
 # ==========================================================
 
-def create_emitter(callback: Optional[Callable] = None) -> StreamEventEmitter:
+def create_emitter(callback: Optional[Callable] = None,
+                   history_limit: Optional[int] = None,
+                   batch_window_ms: int = 0) -> StreamEventEmitter:
     """Create a new event emitter with optional callback."""
-    return StreamEventEmitter(callback=callback)
+    return StreamEventEmitter(callback=callback, history_limit=history_limit,
+                              batch_window_ms=batch_window_ms)
 
